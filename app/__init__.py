@@ -1,31 +1,98 @@
+import logging
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_migrate import Migrate
+from sqlalchemy.exc import TimeoutError as PoolTimeout
 from config import Config
 from .database import db, init_db
+from .logging_setup import init_logging
+from .json_provider import init_json
+from .compression import init_compression
+from .metrics import init_metrics
+from .querycount import init_query_checks
+from .cache import init_cache
+from .auth import init_auth
+from .versions import init_versions
+from .response_cache import init_response_cache
+from .events import init_events
+from .hashing import HashingBusy
+from .gemini_client import init_gemini_client
+from .quote_service import init_quote_service
+from .scheduler import init_scheduler
 
 migrate = Migrate()
+logger = logging.getLogger(__name__)
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config:
+        # Overrides on top of the environment-based Config (tests, scripts)
+        app.config.update(config)
+
+    # orjson-backed JSON responses when orjson is installed
+    init_json(app)
+
+    # gzip/brotli for large responses; registered first so it runs after
+    # every other after_request hook
+    init_compression(app)
+
+    # Structured logging through a background queue, with request ids
+    init_logging(app)
+
+    # Per-endpoint latency/SQL metrics on /metrics (+ optional Server-Timing)
+    init_metrics(app)
+
+    # Warn about repeated statement shapes (N+1 loops) in debug mode
+    init_query_checks(app)
 
     # Initialize database
     init_db(app)
     migrate.init_app(app, db)
 
+    # Cache backend shared by all app processes (in-memory unless CACHE_URL is set)
+    init_cache(app)
+
+    # Bump per-user collection versions (ETags) after successful writes;
+    # cached GET bodies are keyed by those versions and dropped on bumps
+    init_versions(app)
+    init_response_cache(app)
+
+    # Per-user change events for the /api/events SSE stream
+    init_events(app)
+
+    # Resolve JWT settings and the verified-token cache once
+    init_auth(app)
+
+    # Gemini client and the quote pool it refills in the background
+    # (the refill thread starts on the first request)
+    init_gemini_client(app)
+    init_quote_service(app)
+
+    # Optional in-process scheduler (SCHEDULER_INTERVAL), started on the first request
+    init_scheduler(app)
+
     # Enable CORS
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=["X-Next-Cursor", "ETag"])
 
     # Register error handlers
     register_error_handlers(app)
 
+    # Register flask CLI commands
+    from .cli import register_commands
+    register_commands(app)
+
     # Import blueprints *after* db is ready
     from .routes.auth_routes import auth_bp
     from .routes.budget_plan_routes import budget_plans_bp
     from .routes.expense_routes import expenses_bp
     from .routes.category_routes import categories_bp
     from .routes.quotes_routes import quotes_bp
+    from .routes.dashboard_routes import dashboard_bp
+    from .routes.analytics_routes import analytics_bp
+    from .routes.recurring_routes import recurring_bp
+    from .routes.alert_routes import alerts_bp
+    from .routes.event_routes import events_bp
 
     # Register routes
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
@@ -33,6 +100,11 @@ def create_app():
     app.register_blueprint(expenses_bp, url_prefix="/api/expenses")
     app.register_blueprint(categories_bp, url_prefix="/api/categories")
     app.register_blueprint(quotes_bp, url_prefix="/api/quotes")
+    app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
+    app.register_blueprint(analytics_bp, url_prefix="/api/analytics")
+    app.register_blueprint(recurring_bp, url_prefix="/api/recurring")
+    app.register_blueprint(alerts_bp, url_prefix="/api/alerts")
+    app.register_blueprint(events_bp, url_prefix="/api/events")
     @app.teardown_appcontext
     
     def shutdown_session(exception=None):
@@ -58,6 +130,20 @@ def register_error_handlers(app):
     def method_not_allowed(e):
         return jsonify({"error": "method_not_allowed"}), 405
 
+    @app.errorhandler(HashingBusy)
+    def hashing_busy(e):
+        logger.info("password hashing pool busy, rejecting request", extra={"sample_rate": 0.1})
+        response = jsonify({"error": "service_busy", "message": "Too many login attempts in progress, retry shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+    @app.errorhandler(PoolTimeout)
+    def db_pool_exhausted(e):
+        logger.warning("database connection pool exhausted")
+        response = jsonify({"error": "service_busy", "message": "Database is busy, retry shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
     @app.errorhandler(500)
     def internal_error(e):
         return jsonify({"error": "internal_server_error", "message": str(e)}), 500
@@ -0,0 +1,116 @@
+from datetime import date, datetime
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import event, insert, select, update
+from .database import RoutingSession, db
+from .events import emit
+from .models.budget_alert_model import BudgetAlert
+from .models.budget_plan_model import BudgetPlan
+
+PENDING_KEY = "alerts_pending"
+AS_OF_KEY = "alerts_as_of"
+
+
+def queue_evaluation(plan_id):
+    # Called wherever BudgetPlan.spent (or the plan's amount/dates) changes;
+    # the plans are evaluated once, right before the transaction commits
+    db.session.info.setdefault(PENDING_KEY, set()).add(plan_id)
+
+
+def threshold_level(spent, amount, thresholds):
+    # Highest threshold (percent of amount) that spent has reached, or 0
+    if not amount:
+        return 0
+    percent = Decimal(spent or 0) * 100 / Decimal(amount)
+    return max((t for t in thresholds if percent >= t), default=0)
+
+
+def projected_percent(plan, today, min_days):
+    # Spend at the end of the plan if the pace so far continues, as a percent
+    # of amount. None outside the plan or before enough days have passed.
+    if not plan.amount or not plan.start_date <= today <= plan.end_date:
+        return None
+    elapsed = (today - plan.start_date).days + 1
+    total = (plan.end_date - plan.start_date).days + 1
+    if elapsed < min(min_days, total):
+        return None
+    return int(Decimal(plan.spent or 0) * 100 * total / (Decimal(plan.amount) * elapsed))
+
+
+def _claim(session, plan_id, condition, **values):
+    # Conditional UPDATE so two concurrent commits never raise the same alert twice
+    result = session.execute(
+        update(BudgetPlan).where(BudgetPlan.plan_id == plan_id, condition).values(**values)
+    )
+    return result.rowcount == 1
+
+
+def _alert(plan, kind, level):
+    return {
+        "user_id": plan.user_id,
+        "plan_id": plan.plan_id,
+        "kind": kind,
+        "level": level,
+        "spent": plan.spent or 0,
+        "amount": plan.amount,
+        "created_at": datetime.utcnow()
+    }
+
+
+def evaluate_plans(session, plan_ids, today=None):
+    """Raise threshold and pace alerts for plans whose spend changed.
+
+    Only transitions are stored: crossing a higher threshold, or the projected
+    spend going over the plan amount. Dropping back below (e.g. after an
+    expense is deleted) silently re-arms the alert. Returns the alert count.
+    """
+    config = current_app.config
+    thresholds = config["ALERT_THRESHOLDS"]
+    today = today or date.today()
+
+    plans = session.execute(
+        select(
+            BudgetPlan.plan_id, BudgetPlan.user_id, BudgetPlan.amount, BudgetPlan.spent,
+            BudgetPlan.start_date, BudgetPlan.end_date, BudgetPlan.alert_level, BudgetPlan.pace_alert
+        ).where(BudgetPlan.plan_id.in_(plan_ids))
+    ).all()
+
+    alerts = []
+    for plan in plans:
+        level = threshold_level(plan.spent, plan.amount, thresholds)
+        if level > plan.alert_level:
+            if _claim(session, plan.plan_id, BudgetPlan.alert_level < level, alert_level=level):
+                alerts.append(_alert(plan, "threshold", level))
+        elif level < plan.alert_level:
+            _claim(session, plan.plan_id, BudgetPlan.alert_level > level, alert_level=level)
+
+        # Over budget already says more than "on pace to go over"
+        projected = projected_percent(plan, today, config["ALERT_PACE_MIN_DAYS"])
+        ahead = projected is not None and projected > 100 and level < 100
+        if ahead and not plan.pace_alert:
+            if _claim(session, plan.plan_id, BudgetPlan.pace_alert.is_(False), pace_alert=True):
+                alerts.append(_alert(plan, "pace", projected))
+        elif not ahead and plan.pace_alert:
+            _claim(session, plan.plan_id, BudgetPlan.pace_alert.is_(True), pace_alert=False)
+
+        # Live update for open SSE streams, sent once this transaction commits
+        emit(plan.user_id, "plan.spent", plan_id=plan.plan_id, spent=float(plan.spent or 0),
+             amount=float(plan.amount), alert_level=level, pace_alert=ahead)
+
+    if alerts:
+        session.execute(insert(BudgetAlert), alerts)
+        for alert in alerts:
+            emit(alert["user_id"], "alert", plan_id=alert["plan_id"], kind=alert["kind"], level=alert["level"])
+    return len(alerts)
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def _evaluate_pending(session):
+    plan_ids = session.info.pop(PENDING_KEY, None)
+    if plan_ids:
+        evaluate_plans(session, plan_ids, session.info.get(AS_OF_KEY))
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(PENDING_KEY, None)
@@ -1,40 +1,179 @@
 import jwt
-from datetime import datetime, timedelta
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
 from flask import current_app, request, jsonify, g
 from functools import wraps
-from werkzeug.security import generate_password_hash, check_password_hash
+from .hashing import PasswordHasher
+from .metrics import observe_jwt_decode
+from .cache import create_cache
+from .token_store import TokenStore
+
+
+class TokenCache:
+    """Bounded LRU of verified tokens -> claims.
+
+    Keyed by a SHA-256 digest of the token (the raw token is never kept) and
+    entries are dropped at the token's `exp` or after `ttl` seconds,
+    whichever comes first.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token, claims):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, claims["exp"])
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {"size": size, "hits": self.hits, "misses": self.misses}
+
+
+class AuthSettings:
+    # JWT settings resolved once at startup instead of on every request
+    def __init__(self, config, cache):
+        self.secret = config["JWT_SECRET"]
+        self.algorithm = config["JWT_ALGORITHM"]
+        self.algorithms = [self.algorithm]
+        self.access_expires = config["JWT_ACCESS_TOKEN_EXPIRES"]
+        self.refresh_expires = config["JWT_REFRESH_TOKEN_EXPIRES"]
+        # Revocations live in the shared cache unless TOKEN_STORE_URL points elsewhere
+        store_url = config["TOKEN_STORE_URL"]
+        self.token_store = TokenStore(create_cache(store_url) if store_url else cache)
+        self.token_cache = TokenCache(
+            maxsize=config["TOKEN_CACHE_SIZE"],
+            ttl=config["TOKEN_CACHE_TTL"]
+        )
+        self.hasher = PasswordHasher(
+            config["PASSWORD_HASH_METHOD"],
+            workers=config["HASH_WORKERS"],
+            max_pending=config["HASH_MAX_PENDING"],
+            timeout=config["HASH_TIMEOUT"]
+        )
+
+
+def init_auth(app):
+    app.extensions["auth"] = AuthSettings(app.config, app.extensions["cache"])
+
+
+def auth_settings():
+    return current_app.extensions["auth"]
+
 
 def hash_password(plain):
-    return generate_password_hash(plain)
+    return auth_settings().hasher.hash(plain)
 
 def verify_password(hash, plain):
-    return check_password_hash(hash, plain)
+    return auth_settings().hasher.verify(hash, plain)
 
-def create_access_token(identity: dict):
-    secret = current_app.config["JWT_SECRET"]
-    algo = current_app.config["JWT_ALGORITHM"]
-    exp = datetime.utcnow() + current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+def password_needs_rehash(hash):
+    return auth_settings().hasher.needs_rehash(hash)
+
+def _encode_token(identity, token_type, expires):
+    settings = auth_settings()
+    now = datetime.utcnow()
     payload = {
         "sub": identity,
-        "exp": exp,
-        "iat": datetime.utcnow()
+        "exp": now + expires,
+        "iat": now,
+        "jti": uuid.uuid4().hex,
+        "type": token_type
     }
-    token = jwt.encode(payload, secret, algorithm=algo)
+    token = jwt.encode(payload, settings.secret, algorithm=settings.algorithm)
     # PyJWT returns str in newer versions; ensure string type
     if isinstance(token, bytes):
         token = token.decode("utf-8")
     return token
 
+def create_access_token(identity: dict):
+    return _encode_token(identity, "access", auth_settings().access_expires)
+
+def create_refresh_token(identity: dict):
+    # Long-lived token that can only be exchanged at /api/auth/refresh
+    return _encode_token(identity, "refresh", auth_settings().refresh_expires)
+
+def rotate_refresh_token(token):
+    # Revoke a refresh token and return its claims, or an {"error": ...} dict.
+    # Each refresh token can be used exactly once; replaying it is rejected.
+    data = decode_token(token)
+    if data.get("error"):
+        return data
+    if data.get("type") != "refresh" or "jti" not in data:
+        return {"error": "invalid_token"}
+    if not auth_settings().token_store.revoke(data["jti"], data["exp"]):
+        return {"error": "token_revoked"}
+    return data
+
 def decode_token(token):
-    secret = current_app.config["JWT_SECRET"]
-    algo = current_app.config["JWT_ALGORITHM"]
+    settings = auth_settings()
+    started = time.perf_counter()
     try:
-        payload = jwt.decode(token, secret, algorithms=[algo])
+        payload = jwt.decode(token, settings.secret, algorithms=settings.algorithms)
         return payload
     except jwt.ExpiredSignatureError:
         return {"error": "token_expired"}
     except jwt.InvalidTokenError:
         return {"error": "invalid_token"}
+    finally:
+        observe_jwt_decode(time.perf_counter() - started)
+
+def _authenticate(token):
+    # Sets g.current_user and returns None, or returns the 401 response
+    cache = auth_settings().token_cache
+    data = cache.get(token)
+    if data is None:
+        data = decode_token(token)
+        if isinstance(data, dict) and data.get("error"):
+            return jsonify({"error": data["error"]}), 401
+        # refresh tokens are only accepted by /api/auth/refresh
+        if data.get("type", "access") != "access":
+            return jsonify({"error": "invalid_token"}), 401
+        cache.put(token, data)
+
+    # set user identity in flask.g for route use
+    g.current_user = data.get("sub")
+    return None
 
 def jwt_required(fn):
     @wraps(fn)
@@ -44,15 +183,26 @@ def jwt_required(fn):
             return jsonify({"error": "authorization_header_missing"}), 401
 
         parts = auth.split()
-        if parts[0].lower() != "bearer" or len(parts) != 2:
+        if len(parts) != 2 or parts[0].lower() != "bearer":
             return jsonify({"error": "invalid_authorization_header"}), 401
 
-        token = parts[1]
-        data = decode_token(token)
-        if isinstance(data, dict) and data.get("error"):
-            return jsonify({"error": data["error"]}), 401
+        error = _authenticate(parts[1])
+        if error is not None:
+            return error
+        return fn(*args, **kwargs)
+    return wrapper
 
-        # set user identity in flask.g for route use
-        g.current_user = data.get("sub")
+def jwt_required_query(fn):
+    # For EventSource endpoints: browsers cannot set headers on them, so the
+    # access token may also come as ?access_token=. Only use this where needed,
+    # since query strings are more likely to end up in proxy logs.
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = request.args.get("access_token")
+        if not token:
+            return jwt_required(fn)(*args, **kwargs)
+        error = _authenticate(token)
+        if error is not None:
+            return error
         return fn(*args, **kwargs)
     return wrapper
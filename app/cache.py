@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from collections import deque
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "bbuddy:invalidate"
+
+
+class MemoryCache:
+    """In-process cache backend. Keys hold strings (with an optional TTL) or
+    lists; pub/sub delivers messages to this process's subscribers only, so
+    it is only correct when a single process serves all requests.
+
+    Expired keys are dropped when read, and every `sweep_every` writes a
+    sweep removes the ones nobody reads again (e.g. revoked token ids).
+    """
+
+    def __init__(self, sweep_every=1000):
+        self._values = {}  # key -> (value, expires_at or None)
+        self._lists = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self.sweep_every = sweep_every
+        self._writes = 0
+
+    def _wrote(self, now):
+        # Called with the lock held after every write
+        self._writes += 1
+        if self._writes >= self.sweep_every:
+            self._writes = 0
+            expired = [key for key, (_, expires_at) in self._values.items()
+                       if expires_at is not None and expires_at <= now]
+            for key in expired:
+                del self._values[key]
+
+    def _live(self, key, now):
+        entry = self._values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key, time.time())
+            return entry[0] if entry else None
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            self._values[key] = (value, now + ttl if ttl else None)
+            self._wrote(now)
+
+    def add(self, key, value, ttl=None):
+        # Set only if absent; True when this call created the key
+        now = time.time()
+        with self._lock:
+            if self._live(key, now) is not None:
+                return False
+            self._values[key] = (value, now + ttl if ttl else None)
+            self._wrote(now)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+                self._lists.pop(key, None)
+
+    def incr(self, key, amount=1, ttl=None):
+        now = time.time()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is None:
+                value, expires_at = amount, (now + ttl if ttl else None)
+            else:
+                value, expires_at = int(entry[0]) + amount, entry[1]
+            self._values[key] = (value, expires_at)
+            self._wrote(now)
+            return value
+
+    def push(self, key, *values):
+        with self._lock:
+            items = self._lists.setdefault(key, deque())
+            items.extend(values)
+            return len(items)
+
+    def pop(self, key):
+        with self._lock:
+            items = self._lists.get(key)
+            return items.popleft() if items else None
+
+    def length(self, key):
+        with self._lock:
+            return len(self._lists.get(key, ()))
+
+    def publish(self, channel, message):
+        for callback in list(self._subscribers.get(channel, ())):
+            callback(message)
+
+    def subscribe(self, channel, callback):
+        self._subscribers.setdefault(channel, []).append(callback)
+
+
+class RedisCache:
+    """Cache backend shared by every process through Redis (or anything that
+    speaks its protocol). Pub/sub messages are delivered on a background thread."""
+
+    def __init__(self, client, prefix="bbuddy:"):
+        self.client = client
+        self.prefix = prefix
+        self._pubsub = None
+        self._pubsub_thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        import redis  # optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url, decode_responses=True), **kwargs)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(self.prefix + key, value, nx=True, ex=ttl))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def incr(self, key, amount=1, ttl=None):
+        value = self.client.incrby(self.prefix + key, amount)
+        if ttl and value == amount:
+            # First increment created the key: start its window
+            self.client.expire(self.prefix + key, ttl)
+        return value
+
+    def push(self, key, *values):
+        return self.client.rpush(self.prefix + key, *values)
+
+    def pop(self, key):
+        return self.client.lpop(self.prefix + key)
+
+    def length(self, key):
+        return self.client.llen(self.prefix + key)
+
+    def publish(self, channel, message):
+        self.client.publish(self.prefix + channel, message)
+
+    def subscribe(self, channel, callback):
+        with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.prefix + channel: lambda message: callback(message["data"])})
+            if self._pubsub_thread is None:
+                self._pubsub_thread = self._pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+
+def create_cache(url):
+    # "memory://" (default) or a redis://, rediss:// or unix:// URL
+    if not url or url.startswith("memory://"):
+        return MemoryCache()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache.from_url(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+def init_cache(app):
+    app.extensions["cache"] = create_cache(app.config["CACHE_URL"])
+
+
+def cache_backend():
+    return current_app.extensions["cache"]
+
+
+def invalidate(*keys):
+    """Drop shared cache entries and tell every process to drop its local
+    copies too (see `on_invalidate`)."""
+    cache = cache_backend()
+    cache.delete(*keys)
+    for key in keys:
+        cache.publish(INVALIDATE_CHANNEL, key)
+
+
+def on_invalidate(cache, callback):
+    # `callback(key)` runs in every process whenever `invalidate(key)` is called
+    cache.subscribe(INVALIDATE_CHANNEL, callback)
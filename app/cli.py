@@ -0,0 +1,63 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from .cache import MemoryCache
+from .database import db
+from .scheduler import run_due
+from .spending import rebuild_rollups, verify_rollups, rebuild_plan_spent, verify_plan_spent
+
+rollups_cli = AppGroup("rollups", help="Maintain spend_rollups and BudgetPlan.spent.")
+scheduler_cli = AppGroup("scheduler", help="Roll over plans and create recurring expenses.")
+
+
+@rollups_cli.command("verify")
+@click.option("--user-id", type=int, default=None, help="Only check this user.")
+def verify_command(user_id):
+    """Report buckets and plans that disagree with the expenses table."""
+    drift = verify_rollups(user_id)
+    for row in drift:
+        click.echo(
+            "drift user={user_id} plan={plan_id} category={category_id} day={day}: "
+            "total {actual_total} != {expected_total}, count {actual_count} != {expected_count}".format(**row)
+        )
+    spent_drift = verify_plan_spent(user_id)
+    for row in spent_drift:
+        click.echo("drift user={user_id} plan={plan_id}: spent {spent} != {expected_spent}".format(**row))
+
+    if drift or spent_drift:
+        raise click.ClickException(
+            f"{len(drift)} drifted bucket(s), {len(spent_drift)} drifted plan(s); run `flask rollups rebuild`"
+        )
+    click.echo("spend_rollups and plan totals are in sync with expenses")
+
+
+@rollups_cli.command("rebuild")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user.")
+def rebuild_command(user_id):
+    """Recompute spend_rollups and BudgetPlan.spent from expenses."""
+    count = rebuild_rollups(user_id)
+    plans = rebuild_plan_spent(user_id)
+    db.session.commit()
+    click.echo(f"rebuilt {count} bucket(s) and {plans} plan total(s)")
+
+
+@scheduler_cli.command("run")
+@click.option("--date", "today", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Run as of this day instead of today (YYYY-MM-DD).")
+@click.option("--batch-size", type=int, default=None, help="Due rows per batch.")
+def scheduler_run_command(today, batch_size):
+    """Process everything due up to today. Meant for cron on any number of nodes."""
+    # Version bumps and events from this process must reach the web processes
+    if isinstance(current_app.extensions["cache"], MemoryCache):
+        raise click.ClickException(
+            "CACHE_URL is memory://, so the web processes would never see this run's changes "
+            "(stale ETags and cached pages). Point CACHE_URL at the web nodes' Redis, "
+            "or set SCHEDULER_INTERVAL to run the scheduler inside the web process."
+        )
+    result = run_due(today.date() if today else None, batch_size)
+    click.echo("rolled over {plans_rolled} plan(s), created {expenses_created} expense(s)".format(**result))
+
+
+def register_commands(app):
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(scheduler_cli)
@@ -0,0 +1,48 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def _compressible(response):
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    return response.mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def init_compression(app):
+    """Compress JSON/text responses with brotli or gzip, whichever the client
+    prefers, once they reach COMPRESS_MIN_SIZE bytes. Streamed responses
+    (e.g. /expenses/export) are left alone."""
+    if not app.config["COMPRESS_ENABLED"]:
+        return
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+    gzip_level = app.config["COMPRESS_GZIP_LEVEL"]
+    brotli_quality = app.config["COMPRESS_BROTLI_QUALITY"]
+    encodings = (["br"] if brotli is not None else []) + ["gzip"]
+
+    @app.after_request
+    def compress_response(response):
+        if not _compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding == "br":
+            body = brotli.compress(body, quality=brotli_quality)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=gzip_level)
+        else:
+            return response
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        return response
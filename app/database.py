@@ -1,9 +1,192 @@
+import math
+import random
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, jsonify, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from .metrics import REGISTRY, Histogram, metrics_protected, record_timing
+
+LAST_WRITE_COOKIE = "bb_last_write"
+
+
+class RoutingSession(Session):
+    """Sends SELECTs to the replica chosen for this request (see `read_replica`).
+    Flushes and INSERT/UPDATE/DELETE statements always go to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase):
+            replica = g.get("replica_bind") if has_request_context() else None
+            if replica is not None:
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+POOL_WAIT = REGISTRY.add(Histogram(
+    "bbuddy_db_pool_wait_seconds", "Time spent waiting for a pooled DB connection.", ("pool",),
+    (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30)))
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait and how often they time out."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.label = "default"
+        self.timeouts = 0
+        self.max_wait = 0.0
+        self._stats_lock = threading.Lock()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.max_wait = max(self.max_wait, waited)
+            POOL_WAIT.observe(waited, self.label)
+            record_timing("pool_wait", waited)
+
+
+def engine_options(uri, config):
+    """Build engine options for `uri` from the DB_POOL_* settings.
+
+    Pre-ping and a recycle below MySQL's wait_timeout stop the server from
+    killing idle connections we still hold. In-memory SQLite keeps
+    Flask-SQLAlchemy's StaticPool, which takes no sizing options.
+    """
+    if not uri:
+        return {}
+    url = make_url(uri)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+
+
+def pool_stats():
+    # Snapshot of every engine's pool; needs an app context
+    stats = {}
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        name = bind or "default"
+        entry = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            })
+        if isinstance(pool, TimedQueuePool):
+            entry.update({"timeouts": pool.timeouts, "max_wait_ms": round(pool.max_wait * 1000, 1)})
+        stats[name] = entry
+    return stats
+
+
+def _pool_collector(app):
+    def collect():
+        with app.app_context():
+            stats = pool_stats()
+        lines = []
+        for metric, key, kind in (
+            ("bbuddy_db_pool_checked_out", "checked_out", "gauge"),
+            ("bbuddy_db_pool_overflow", "overflow", "gauge"),
+            ("bbuddy_db_pool_size", "size", "gauge"),
+            ("bbuddy_db_pool_timeouts_total", "timeouts", "counter"),
+        ):
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, entry in stats.items():
+                if key in entry:
+                    lines.append(f'{metric}{{pool="{name}"}} {entry[key]}')
+        return lines
+    return collect
+
+
+def _recently_wrote():
+    # Read-your-writes: the last-write cookie lives for the replication-lag window
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - last_write < current_app.config["DB_READ_AFTER_WRITE_WINDOW"]
+
+
+def read_replica(f):
+    """Run a read-only handler against a replica, unless this client wrote
+    something within DB_READ_AFTER_WRITE_WINDOW seconds."""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        replicas = current_app.extensions["db_replicas"]
+        if replicas and not _recently_wrote():
+            g.replica_bind = random.choice(replicas)
+        return f(*args, **kwargs)
+    return wrapper
 
-db = SQLAlchemy()
 
 def init_db(app):
-    app.config.from_object("config.Config")
+    # Explicit SQLALCHEMY_ENGINE_OPTIONS still win over the DB_POOL_* defaults
+    options = engine_options(app.config.get("SQLALCHEMY_DATABASE_URI"), app.config)
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    replicas = []
+    for i, uri in enumerate(app.config["DB_REPLICA_URIS"]):
+        key = f"replica_{i}"
+        binds[key] = {"url": uri, **engine_options(uri, app.config)}
+        replicas.append(key)
+    app.config["SQLALCHEMY_BINDS"] = binds
+    app.extensions["db_replicas"] = replicas
     db.init_app(app)
-    return db
 
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            if isinstance(engine.pool, TimedQueuePool):
+                engine.pool.label = bind or "default"
+
+    REGISTRY.collectors["db_pool"] = _pool_collector(app)
+
+    if replicas:
+        @app.after_request
+        def mark_write(response):
+            # Pin this client to the primary until replicas have caught up
+            if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+                response.set_cookie(
+                    LAST_WRITE_COOKIE, f"{time.time():.3f}",
+                    max_age=math.ceil(app.config["DB_READ_AFTER_WRITE_WINDOW"]),
+                    httponly=True, samesite="Lax"
+                )
+            return response
+
+    @app.route("/metrics/db_pool")
+    @metrics_protected
+    def db_pool_metrics():
+        return jsonify(pool_stats())
+
+    return db
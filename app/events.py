@@ -0,0 +1,116 @@
+import json
+import queue
+import threading
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import event
+from .database import RoutingSession, db
+
+EVENTS_CHANNEL = "events"
+PENDING_KEY = "events_pending"
+
+
+class Subscription:
+    """Bounded queue of events for one open stream. A client too slow to keep
+    up is marked lagged instead of blocking publishers; its stream then tells
+    it to reload everything."""
+
+    def __init__(self, maxsize):
+        self.events = queue.Queue(maxsize)
+        self.lagged = False
+
+    def put(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.lagged = True
+
+    def reset(self):
+        # Drop whatever is queued; the client is about to reload everything
+        self.lagged = False
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                return
+
+    def get(self, timeout):
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """Per-user change events for the SSE streams of this process.
+
+    Events go out through the cache backend's pub/sub: with the memory
+    backend they reach this process's streams directly, with Redis every
+    node receives them and hands them to its own subscribers.
+    """
+
+    def __init__(self, cache, queue_size=100):
+        self.cache = cache
+        self.queue_size = queue_size
+        self._subscriptions = defaultdict(set)  # user_id -> {Subscription}
+        self._lock = threading.Lock()
+        cache.subscribe(EVENTS_CHANNEL, self._deliver)
+
+    def publish(self, user_id, event_type, data):
+        self.cache.publish(EVENTS_CHANNEL, json.dumps({"user_id": user_id, "type": event_type, "data": data}))
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[user_id]
+
+    def _deliver(self, message):
+        event = json.loads(message)
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event["user_id"], ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self._subscriptions),
+                "streams": sum(len(s) for s in self._subscriptions.values())
+            }
+
+
+def init_events(app):
+    app.extensions["events"] = EventBroker(app.extensions["cache"], queue_size=app.config["SSE_QUEUE_SIZE"])
+
+
+def event_broker():
+    return current_app.extensions["events"]
+
+
+def emit(user_id, event_type, **data):
+    """Queue a change event for `user_id`. It is published only once the
+    current transaction commits, and dropped if it rolls back."""
+    db.session.info.setdefault(PENDING_KEY, []).append((user_id, event_type, data))
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _publish_pending(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        broker = event_broker()
+        for user_id, event_type, data in pending:
+            broker.publish(user_id, event_type, data)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(PENDING_KEY, None)
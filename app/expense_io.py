@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+from itertools import islice
+
+CSV_TYPES = ("text/csv", "application/csv")
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+
+def detect_format(mimetype, requested=None):
+    # Explicit ?format= wins over the Content-Type header
+    if requested in ("csv", "ndjson"):
+        return requested
+    if mimetype in CSV_TYPES:
+        return "csv"
+    if mimetype in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+
+def iter_csv_rows(stream):
+    # Yields (line_number, row_dict) for every CSV record, reading the body lazily
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, {k.strip(): v for k, v in row.items() if k}
+
+
+def iter_ndjson_rows(stream):
+    # Yields (line_number, row_dict) for every JSON line; bad lines yield an error string
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig")
+    for line_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, "invalid_json"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "invalid_json"
+            continue
+        yield line_number, row
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+EXPORT_FIELDS = ("expense_id", "plan_id", "category_id", "category_name", "amount", "description", "expense_date")
+
+
+def export_value(value):
+    # Plain text form for CSV/NDJSON cells (Decimal amounts stay exact)
+    if value is None:
+        return None
+    if isinstance(value, (int, str)):
+        return value
+    return str(value)
+
+
+def csv_chunks(rows, chunk_rows=500):
+    # Encode rows as CSV, yielding one string per chunk of rows
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([export_value(v) for v in row])
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(rows, chunk_rows=500):
+    # Encode rows as JSON lines, yielding one string per chunk of rows
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, map(export_value, row)))))
+        if len(lines) == chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from config import GEMINI_API_KEY
+from .metrics import observe_gemini
+
+API_BASE = "https://generativelanguage.googleapis.com/v1beta/models"
+
+logger = logging.getLogger(__name__)
+
+QUOTE_PROMPT = """Give me a short, motivational quote about personal finance, budgeting, or saving money.
+                Make it inspiring and practical. Keep it under 180 characters.
+                Return ONLY the quote text, nothing else."""
+
+
+class CircuitBreaker:
+    """Per-model breaker: opens after `failure_threshold` consecutive failures,
+    then lets a single half-open probe through every `reset_timeout` seconds."""
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        # Returns True when this failure opened the breaker
+        with self._lock:
+            self.failures += 1
+            opened = False
+            # A late failure from a call started before the breaker opened must
+            # not restart the wait for the half-open probe
+            if self.state != "open" and (self.state == "half_open" or self.failures >= self.failure_threshold):
+                opened = True
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probing = False
+            return opened
+
+
+class ModelStats:
+    def __init__(self):
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0  # skipped because the breaker was open
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ok, latency):
+        with self._lock:
+            self.requests += 1
+            if ok:
+                self.successes += 1
+            else:
+                self.failures += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "successes": self.successes,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "avg_latency_ms": round(self.latency_total / self.requests * 1000, 1) if self.requests else None,
+                "max_latency_ms": round(self.latency_max * 1000, 1)
+            }
+
+
+def extract_quote(response_json):
+    # Gemini 2.x and older responses put the text in different places
+    quote = None
+    if "candidates" in response_json and response_json["candidates"]:
+        candidate = response_json["candidates"][0]
+        if "content" in candidate and "parts" in candidate["content"]:
+            quote = candidate["content"]["parts"][0]["text"]
+    elif "text" in response_json:
+        quote = response_json["text"]
+    elif "response" in response_json:
+        quote = response_json["response"]
+
+    if not quote:
+        return None
+    quote = quote.strip()
+    # Clean up quotes
+    if len(quote) > 2 and quote[0] == '"' and quote[-1] == '"':
+        quote = quote[1:-1]
+    return quote or None
+
+
+class GeminiClient:
+    """Gemini client with a pooled keep-alive session, hedged requests across
+    models and a circuit breaker per model.
+
+    `generate()` starts the first healthy model, then another one every
+    `hedge_delay` seconds while nothing has answered yet, and returns the
+    first good quote. Worst-case latency is one `timeout`, not one per model.
+    """
+
+    def __init__(self, api_key, models, timeout=5, hedge_delay=0.5,
+                 failure_threshold=3, reset_timeout=30):
+        self.api_key = api_key
+        self.models = list(models)
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.breakers = {m: CircuitBreaker(failure_threshold, reset_timeout) for m in self.models}
+        self.stats = {m: ModelStats() for m in self.models}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(4, len(self.models) * 2))
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json", "x-goog-api-key": api_key or ""})
+        self._executor = ThreadPoolExecutor(max_workers=max(2, len(self.models) * 2), thread_name_prefix="gemini")
+
+    def _call(self, model_name):
+        # One generateContent request; returns the quote or None
+        data = {
+            "contents": [{"parts": [{"text": QUOTE_PROMPT}]}],
+            "generationConfig": {
+                "temperature": 0.8,  # Slightly more creative
+                "maxOutputTokens": 50,
+            }
+        }
+        started = time.perf_counter()
+        quote = None
+        error = None
+        try:
+            response = self.session.post(f"{API_BASE}/{model_name}:generateContent", json=data, timeout=self.timeout)
+            if response.status_code == 200:
+                quote = extract_quote(response.json())
+                error = None if quote else "unexpected_response"
+            else:
+                error = f"http_{response.status_code}"
+        except (requests.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
+            error = type(e).__name__
+
+        latency = time.perf_counter() - started
+        self.stats[model_name].record(quote is not None, latency)
+        observe_gemini(model_name, quote is not None, latency)
+        if quote:
+            self.breakers[model_name].record_success()
+            return quote
+
+        logger.info("gemini request failed", extra={
+            "model": model_name, "error": error, "latency_ms": round(latency * 1000, 1), "sample_rate": 0.2
+        })
+        if self.breakers[model_name].record_failure():
+            logger.warning("gemini circuit opened", extra={"model": model_name})
+        return None
+
+    def generate(self):
+        # Returns (quote, model) from the first model to answer, or None
+        if not self.api_key:
+            return None
+
+        deadline = time.monotonic() + self.timeout
+        pending = {}
+        candidates = iter(self.models)
+
+        def launch_next():
+            for model_name in candidates:
+                if self.breakers[model_name].allow():
+                    pending[self._executor.submit(self._call, model_name)] = model_name
+                    return True
+                self.stats[model_name].rejected += 1
+            return False
+
+        launch_next()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            done, _ = wait(pending, timeout=min(self.hedge_delay, remaining) if self.hedge_delay else remaining,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                model_name = pending.pop(future)
+                quote = future.result()
+                if quote:
+                    return quote, model_name
+            # Nothing good yet (slow or failed): hedge with the next healthy model
+            if not launch_next() and not pending:
+                return None
+        return None
+
+    def list_models(self):
+        response = self.session.get(API_BASE, timeout=self.timeout)
+        return [model["name"] for model in response.json().get("models", [])]
+
+    def metrics(self):
+        return {
+            model: {**self.stats[model].snapshot(), "circuit": self.breakers[model].state}
+            for model in self.models
+        }
+
+
+def init_gemini_client(app):
+    from .routes.quotes_routes import MODEL_OPTIONS
+
+    app.extensions["gemini"] = GeminiClient(
+        GEMINI_API_KEY,
+        MODEL_OPTIONS,
+        timeout=app.config["GEMINI_TIMEOUT"],
+        hedge_delay=app.config["GEMINI_HEDGE_DELAY"],
+        failure_threshold=app.config["GEMINI_BREAKER_THRESHOLD"],
+        reset_timeout=app.config["GEMINI_BREAKER_RESET"]
+    )
+
+
+def gemini_client():
+    return current_app.extensions["gemini"]
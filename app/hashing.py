@@ -0,0 +1,93 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+
+class HashingBusy(Exception):
+    # Raised when too many hash jobs are already queued, or one did not
+    # finish within the timeout; mapped to 503
+    pass
+
+
+def method_prefix(method):
+    # The "algo:params" prefix werkzeug writes for `method`, with its defaults
+    # filled in ("scrypt" -> "scrypt:32768:8:1"), without hashing anything
+    name, *args = method.split(":")
+    if name == "scrypt":
+        n, r, p = args or (2**15, 8, 1)
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+class PasswordHasher:
+    """Runs password hashing/verification in a bounded process pool.
+
+    At most `max_pending` jobs may be queued or running; anything beyond
+    that is rejected straight away with HashingBusy instead of making the
+    request thread wait behind a burst of logins. `workers=0` hashes
+    inline in the calling thread.
+    """
+
+    def __init__(self, method, workers=2, max_pending=16, timeout=10):
+        self.method = method
+        self.prefix = method_prefix(method)
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Created on first use so CLI commands and imports never start it.
+        # Spawned, not forked: a forked gevent worker would hand its
+        # monkey-patched threading/queues (and any open sockets) to the children
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is freed when the job really ends, not when we stop waiting,
+        # so timed-out jobs still count against max_pending
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()  # drops it if it never started
+            raise HashingBusy() from None
+
+    def hash(self, plain):
+        return self._run(generate_password_hash, plain, self.method)
+
+    def verify(self, hashed, plain):
+        return self._run(check_password_hash, hashed, plain)
+
+    def needs_rehash(self, hashed):
+        # True when the stored hash was made with other parameters than configured
+        return hashed.split("$", 1)[0] != self.prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,124 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    # One JSON object per line: ts, level, logger, msg, request_id and any extras
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", "-") != "-":
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "sample_rate":
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    # Runs on the request thread, before the record is queued
+    def filter(self, record):
+        record.request_id = g.get("request_id", "-") if has_request_context() else "-"
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Drops a share of noisy records: pass `extra={"sample_rate": 0.1}` to keep
+    about 10% of them. Warnings and above are never sampled out."""
+
+    def filter(self, record):
+        rate = getattr(record, "sample_rate", None)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < rate
+
+
+class _QueueHandler(QueueHandler):
+    # Render the message and traceback up front (the listener thread has no
+    # request context), but leave the rest of the formatting to the listener
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def init_logging(app):
+    """Send the `app` logger hierarchy through a queue so formatting and I/O
+    happen on a background thread instead of the request thread."""
+    global _listener
+
+    logger = logging.getLogger("app")
+    logger.setLevel(app.config["LOG_LEVEL"])
+    logger.propagate = False
+
+    if _listener is None:
+        stream = logging.StreamHandler(sys.stdout)
+        if app.config["LOG_FORMAT"] == "json":
+            stream.setFormatter(JsonFormatter())
+        else:
+            stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+        log_queue = queue.SimpleQueue()
+        handler = _QueueHandler(log_queue)
+        handler.addFilter(RequestIdFilter())
+        handler.addFilter(SamplingFilter())
+        logger.handlers[:] = [handler]
+
+        _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+    access_log = logging.getLogger("app.access")
+    access_sample_rate = app.config["LOG_ACCESS_SAMPLE_RATE"]
+
+    @app.before_request
+    def assign_request_id():
+        # Reuse the proxy's id when there is one so logs can be joined up
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        response.headers["X-Request-ID"] = g.get("request_id", "")
+        started = g.get("request_started")
+        access_log.info(
+            "%s %s %s", request.method, request.path, response.status_code,
+            extra={
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2) if started else None,
+                "sample_rate": access_sample_rate if response.status_code < 400 else None
+            }
+        )
+        return response
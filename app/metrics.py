@@ -0,0 +1,221 @@
+import hmac
+import threading
+import time
+from functools import wraps
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labels + ("le",), values + (bound,))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labels + ("le",), values + ("+Inf",))
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                labels = _format_labels(self.labels, values)
+                lines.append(f"{self.name}_sum{labels} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = {}  # name -> callable returning extra exposition lines
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collect in self.collectors.values():
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.add(Histogram(
+    "bbuddy_http_request_duration_seconds", "Request latency by endpoint.", ("method", "endpoint", "status")))
+REQUEST_QUERIES = REGISTRY.add(Histogram(
+    "bbuddy_db_queries_per_request", "SQL statements executed per request.", ("endpoint",), COUNT_BUCKETS))
+REQUEST_DB_TIME = REGISTRY.add(Histogram(
+    "bbuddy_db_time_per_request_seconds", "Time spent in SQL per request.", ("endpoint",)))
+JWT_DECODE = REGISTRY.add(Histogram(
+    "bbuddy_jwt_decode_seconds", "Time spent verifying JWTs (cache misses only)."))
+GEMINI_LATENCY = REGISTRY.add(Histogram(
+    "bbuddy_gemini_request_seconds", "Outbound Gemini request latency.", ("model", "outcome")))
+
+
+def _timings():
+    if has_request_context():
+        return g.get("timings")
+    return None
+
+
+def record_timing(name, seconds):
+    # Add to the current request's Server-Timing breakdown (no-op outside requests)
+    timings = _timings()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def observe_jwt_decode(seconds):
+    JWT_DECODE.observe(seconds)
+    record_timing("jwt", seconds)
+
+
+def observe_gemini(model, ok, seconds):
+    GEMINI_LATENCY.observe(seconds, model, "ok" if ok else "error")
+    record_timing("gemini", seconds)
+
+
+# The start time lives on the statement's execution context, not the pooled
+# connection: a statement that raises never reaches after_cursor_execute, and
+# its context is simply dropped instead of leaving a stale entry behind
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._bbuddy_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_bbuddy_started", None)
+    timings = _timings()
+    if timings is not None and started is not None:
+        timings["db"] = timings.get("db", 0.0) + time.perf_counter() - started
+        timings["db_queries"] = timings.get("db_queries", 0) + 1
+
+
+def _app_collector(app):
+    # Gauges/counters owned by other components, read at scrape time
+    def collect():
+        lines = []
+        auth = app.extensions.get("auth")
+        if auth is not None:
+            stats = auth.token_cache.stats()
+            lines += [
+                "# TYPE bbuddy_token_cache_hits_total counter",
+                f"bbuddy_token_cache_hits_total {stats['hits']}",
+                "# TYPE bbuddy_token_cache_misses_total counter",
+                f"bbuddy_token_cache_misses_total {stats['misses']}",
+                "# TYPE bbuddy_token_cache_size gauge",
+                f"bbuddy_token_cache_size {stats['size']}",
+            ]
+        responses = app.extensions.get("response_cache")
+        if responses is not None:
+            stats = responses.stats()
+            lines += [
+                "# TYPE bbuddy_response_cache_hits_total counter",
+                f"bbuddy_response_cache_hits_total {stats['hits']}",
+                "# TYPE bbuddy_response_cache_misses_total counter",
+                f"bbuddy_response_cache_misses_total {stats['misses']}",
+                "# TYPE bbuddy_response_cache_size gauge",
+                f"bbuddy_response_cache_size {stats['size']}",
+            ]
+        events = app.extensions.get("events")
+        if events is not None:
+            lines += ["# TYPE bbuddy_event_streams gauge", f"bbuddy_event_streams {events.stats()['streams']}"]
+        quotes = app.extensions.get("quotes")
+        if quotes is not None:
+            lines += ["# TYPE bbuddy_quote_pool_size gauge", f"bbuddy_quote_pool_size {len(quotes)}"]
+        gemini = app.extensions.get("gemini")
+        if gemini is not None:
+            lines.append("# TYPE bbuddy_gemini_circuit_open gauge")
+            for model, stats in gemini.metrics().items():
+                lines.append(f'bbuddy_gemini_circuit_open{{model="{model}"}} {int(stats["circuit"] != "closed")}')
+        return lines
+    return collect
+
+
+def metrics_protected(fn):
+    """Scrape endpoints are off (404) unless METRICS_TOKEN is set, and then
+    need `Authorization: Bearer <METRICS_TOKEN>` (Prometheus `authorization`)."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = current_app.config["METRICS_TOKEN"]
+        if not token:
+            return jsonify({"error": "not_found", "message": "Not found"}), 404
+        auth = request.headers.get("Authorization", "")
+        scheme, _, given = auth.partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(given.strip().encode(), token.encode()):
+            return jsonify({"error": "unauthorized", "message": "Metrics token required"}), 401
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def init_metrics(app):
+    REGISTRY.collectors["app"] = _app_collector(app)
+
+    @app.before_request
+    def start_timer():
+        g.timings = {"start": time.perf_counter()}
+
+    @app.after_request
+    def observe_request(response):
+        timings = g.get("timings")
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings["start"]
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        if endpoint.startswith("/metrics"):
+            return response
+
+        REQUEST_LATENCY.observe(total, request.method, endpoint, response.status_code)
+        REQUEST_QUERIES.observe(timings.get("db_queries", 0), endpoint)
+        REQUEST_DB_TIME.observe(timings.get("db", 0.0), endpoint)
+
+        if current_app.config["METRICS_SERVER_TIMING"]:
+            parts = [f'db;dur={timings.get("db", 0.0) * 1000:.2f};desc="{timings.get("db_queries", 0)} queries"']
+            for name in ("pool_wait", "jwt", "gemini"):
+                if name in timings:
+                    parts.append(f"{name};dur={timings[name] * 1000:.2f}")
+            parts.append(f"total;dur={total * 1000:.2f}")
+            response.headers["Server-Timing"] = ", ".join(parts)
+        return response
+
+    @app.route("/metrics")
+    @metrics_protected
+    def metrics():
+        return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,18 @@
+from ..database import db
+from datetime import datetime
+
+class BudgetAlert(db.Model):
+    # One row per alert raised by app/alerts.py; alert_id doubles as the
+    # feed cursor for GET /api/alerts?since=<alert_id>
+    __tablename__ = 'budget_alerts'
+    __table_args__ = (
+        db.Index('ix_budget_alerts_feed', 'user_id', 'alert_id'),
+    )
+    alert_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    plan_id = db.Column(db.Integer, db.ForeignKey('budget_plans.plan_id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # "threshold" or "pace"
+    level = db.Column(db.Integer, nullable=False)  # threshold crossed, or projected % of amount for pace
+    spent = db.Column(db.Numeric(10,2), nullable=False)
+    amount = db.Column(db.Numeric(10,2), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
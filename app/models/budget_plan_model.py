@@ -11,6 +11,14 @@ class BudgetPlan(db.Model):
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # When set, the scheduler opens a same-length follow-up plan once this one ends.
+    # rolled_from_plan_id is unique so each plan gets at most one successor.
+    auto_rollover = db.Column(db.Boolean, nullable=False, default=False)
+    rolled_from_plan_id = db.Column(db.Integer, db.ForeignKey('budget_plans.plan_id', ondelete='SET NULL'), unique=True)
+    # Alert state kept by app/alerts.py: highest threshold (percent) already
+    # alerted, and whether the spending-pace warning is currently raised
+    alert_level = db.Column(db.Integer, nullable=False, default=0)
+    pace_alert = db.Column(db.Boolean, nullable=False, default=False)
 
     # Add cascade and passive_deletes
     expenses = db.relationship('Expense', backref='plan', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
\ No newline at end of file
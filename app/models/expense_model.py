@@ -3,6 +3,13 @@ from datetime import datetime
 
 class Expense(db.Model):
     __tablename__ = 'expenses'
+    # Composite indexes for keyset pagination on (expense_date, expense_id),
+    # optionally narrowed by plan or category
+    __table_args__ = (
+        db.Index('ix_expenses_user_date', 'user_id', 'expense_date', 'expense_id'),
+        db.Index('ix_expenses_user_plan_date', 'user_id', 'plan_id', 'expense_date', 'expense_id'),
+        db.Index('ix_expenses_user_category_date', 'user_id', 'category_id', 'expense_date', 'expense_id'),
+    )
     expense_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
     plan_id = db.Column(db.Integer, db.ForeignKey('budget_plans.plan_id', ondelete='CASCADE'), nullable=False)  #  Add ondelete
@@ -10,3 +17,6 @@ class Expense(db.Model):
     amount = db.Column(db.Numeric(10,2), nullable=False)
     description = db.Column(db.String(255))
     expense_date = db.Column(db.DateTime, default=datetime.utcnow)
+    # "<recurring_id>:<occurrence date>" for expenses created from a recurring
+    # template; unique so a scheduler run can never create the same one twice
+    recurrence_key = db.Column(db.String(64), unique=True)
@@ -0,0 +1,24 @@
+from ..database import db
+from datetime import datetime
+
+class RecurringExpense(db.Model):
+    # Template materialized into expenses by the scheduler (see app/scheduler.py).
+    # Occurrence n falls on start_date + n * interval units of `frequency`;
+    # next_date is the first one not yet created.
+    __tablename__ = 'recurring_expenses'
+    __table_args__ = (
+        db.Index('ix_recurring_due', 'active', 'next_date'),
+    )
+    recurring_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    plan_id = db.Column(db.Integer, db.ForeignKey('budget_plans.plan_id', ondelete='CASCADE'), nullable=False)
+    amount = db.Column(db.Numeric(10,2), nullable=False)
+    description = db.Column(db.String(255))
+    frequency = db.Column(db.String(10), nullable=False)  # daily, weekly or monthly
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date)
+    occurrences = db.Column(db.Integer, nullable=False, default=0)
+    next_date = db.Column(db.Date, nullable=False)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,12 @@
+from ..database import db
+
+class SpendRollup(db.Model):
+    # Pre-aggregated spend per (user, plan, category, day), kept in sync with
+    # the expenses table by every expense mutation (see app/spending.py)
+    __tablename__ = 'spend_rollups'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    plan_id = db.Column(db.Integer, db.ForeignKey('budget_plans.plan_id', ondelete='CASCADE'), primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.category_id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Numeric(12,2), nullable=False, default=0)
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
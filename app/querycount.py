@@ -0,0 +1,102 @@
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAM_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)")
+
+
+def statement_shape(statement):
+    # Collapse whitespace and IN (...) lists so "same query, other ids" compares equal
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PARAM_LIST.sub("(?)", shape)
+
+
+class QueryCounter:
+    """Records every SQL statement run on the current thread while active."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        if not hasattr(_local, "counters"):
+            _local.counters = []
+        _local.counters.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _local.counters.remove(self)
+        return False
+
+    def repeated(self, threshold=2):
+        # Statement shapes executed at least `threshold` times
+        shapes = Counter(statement_shape(s) for s in self.statements)
+        return {shape: n for shape, n in shapes.items() if n >= threshold}
+
+
+def count_queries():
+    """Usage in tests:
+
+        with count_queries() as queries:
+            client.get("/api/dashboard", headers=auth)
+        assert queries.count <= 5
+    """
+    return QueryCounter()
+
+
+@contextmanager
+def assert_max_queries(limit):
+    # Fails with the offending statements when the block runs more than `limit` queries
+    with count_queries() as queries:
+        yield queries
+    if queries.count > limit:
+        listing = "\n".join(f"  {i}. {statement_shape(s)}" for i, s in enumerate(queries.statements, 1))
+        raise AssertionError(f"{queries.count} queries executed, expected at most {limit}:\n{listing}")
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for counter in getattr(_local, "counters", ()):
+        counter.statements.append(statement)
+    if has_request_context():
+        shapes = g.get("query_shapes")
+        if shapes is not None:
+            shapes[statement_shape(statement)] += 1
+
+
+def init_query_checks(app):
+    """In debug mode (or with QUERY_REPEAT_WARN), log a warning when one
+    request runs the same statement shape QUERY_REPEAT_THRESHOLD+ times,
+    which is what an N+1 lazy-loading loop looks like."""
+    if not (app.debug or app.config["QUERY_REPEAT_WARN"]):
+        return
+
+    @app.before_request
+    def start_query_shapes():
+        g.query_shapes = Counter()
+
+    @app.after_request
+    def warn_repeated_queries(response):
+        shapes = g.get("query_shapes")
+        if not shapes:
+            return response
+        threshold = current_app.config["QUERY_REPEAT_THRESHOLD"]
+        for shape, count in shapes.items():
+            if count >= threshold:
+                logger.warning("repeated SQL statement, possible N+1", extra={
+                    "endpoint": request.endpoint, "count": count, "statement": shape[:500]
+                })
+        return response
@@ -0,0 +1,126 @@
+import json
+import logging
+import math
+import random
+import threading
+import uuid
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteService:
+    """Serves quotes from an in-memory pool that a background thread keeps full.
+
+    `generator` is any callable returning `(quote, model)` or None on failure,
+    so tests can plug in a local fake instead of calling Gemini. Requests never
+    wait on the generator: when the pool is empty they get a fallback quote.
+
+    The pool is a list in the cache backend, so with a shared backend every
+    node serves from (and refills) the same pool. The refill lock lives for
+    `lock_ttl` seconds and is renewed before every generator call, so it must
+    outlast one call (see GEMINI_TIMEOUT), not the whole refill.
+    """
+
+    POOL_KEY = "quotes:pool"
+    REFILL_LOCK = "quotes:refill"
+
+    def __init__(self, generator, fallback_quotes, cache, pool_size=20, refill_below=5, retry_interval=30,
+                 lock_ttl=60):
+        self.generator = generator
+        self.cache = cache
+        self.fallback_quotes = list(fallback_quotes)
+        self.pool_size = pool_size
+        self.refill_below = refill_below
+        self.retry_interval = retry_interval
+        self.lock_ttl = lock_ttl
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._refill_loop, name="quote-prefetch", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def get(self):
+        # Started lazily so importing the app or running CLI commands spawns no thread
+        if self._thread is None:
+            self.start()
+        item = self.cache.pop(self.POOL_KEY)
+        if item is not None:
+            quote, model = json.loads(item)
+            result = {"quote": quote, "source": "gemini", "model": model}
+        else:
+            result = {"quote": random.choice(self.fallback_quotes), "source": "fallback", "model": "none"}
+        if len(self) < self.refill_below:
+            self._wake.set()
+        return result
+
+    def fill(self):
+        # Generate quotes until the pool is full or the generator fails.
+        # Only one node refills a shared pool at a time.
+        token = uuid.uuid4().hex
+        if not self.cache.add(self.REFILL_LOCK, token, ttl=self.lock_ttl):
+            return False
+        try:
+            while len(self) < self.pool_size and not self._stop.is_set():
+                if not self._renew_lock(token):
+                    logger.warning("quote refill lock lost, stopping refill")
+                    return False
+                try:
+                    item = self.generator()
+                except Exception:
+                    logger.warning("quote generator raised", exc_info=True)
+                    item = None
+                if not item:
+                    logger.info("quote pool refill stopped", extra={"pool_size": len(self), "sample_rate": 0.2})
+                    return False
+                self.cache.push(self.POOL_KEY, json.dumps(list(item)))
+            return True
+        finally:
+            if self.cache.get(self.REFILL_LOCK) == token:
+                self.cache.delete(self.REFILL_LOCK)
+
+    def _renew_lock(self, token):
+        # Push the expiry back while this node still holds the lock
+        if self.cache.get(self.REFILL_LOCK) != token:
+            return False
+        self.cache.set(self.REFILL_LOCK, token, ttl=self.lock_ttl)
+        return True
+
+    def _refill_loop(self):
+        while not self._stop.is_set():
+            self.fill()
+            # Sleep until a request drains the pool, or retry later after a failure
+            self._wake.wait(self.retry_interval)
+            self._wake.clear()
+
+    def __len__(self):
+        return self.cache.length(self.POOL_KEY)
+
+
+def init_quote_service(app):
+    from .routes.quotes_routes import FALLBACK_QUOTES
+
+    app.extensions["quotes"] = QuoteService(
+        generator=app.config.get("QUOTE_GENERATOR") or app.extensions["gemini"].generate,
+        fallback_quotes=FALLBACK_QUOTES,
+        cache=app.extensions["cache"],
+        pool_size=app.config["QUOTE_POOL_SIZE"],
+        refill_below=app.config["QUOTE_POOL_REFILL_BELOW"],
+        retry_interval=app.config["QUOTE_RETRY_INTERVAL"],
+        # Long enough for one generator call (bounded by GEMINI_TIMEOUT), with margin
+        lock_ttl=max(60, app.config["QUOTE_RETRY_INTERVAL"], math.ceil(app.config["GEMINI_TIMEOUT"] * 2))
+    )
+
+
+def quote_service():
+    return current_app.extensions["quotes"]
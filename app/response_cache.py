@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from .cache import on_invalidate
+
+
+def invalidation_key(user_id, collection):
+    return f"collection:{user_id}:{collection}"
+
+
+class ResponseCache:
+    """Per-process LRU of serialized GET response bodies.
+
+    Entries are keyed by user and full path and remember the ETag they were
+    built for, so a hit never serves data older than the user's collection
+    versions. Bumping a version also broadcasts an invalidation that drops the
+    user's affected entries in every process right away.
+    """
+
+    def __init__(self, maxsize=1000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (user_id, path) -> (etag, collections, body, mimetype, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id, path, etag):
+        key = (user_id, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == etag and entry[4] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], entry[3]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, user_id, path, etag, collections, body, mimetype):
+        if self.maxsize <= 0:
+            return
+        key = (user_id, path)
+        with self._lock:
+            self._entries[key] = (etag, frozenset(collections), body, mimetype, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def drop(self, user_id, collection):
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if key[0] == user_id and collection in entry[1]]
+            for key in stale:
+                del self._entries[key]
+
+    def handle_invalidation(self, key):
+        # Messages look like "collection:<user_id>:<collection>"
+        parts = str(key).split(":")
+        if len(parts) == 3 and parts[0] == "collection" and parts[1].isdigit():
+            self.drop(int(parts[1]), parts[2])
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {"size": size, "hits": self.hits, "misses": self.misses}
+
+
+def init_response_cache(app):
+    response_cache = ResponseCache(
+        maxsize=app.config["RESPONSE_CACHE_SIZE"],
+        ttl=app.config["RESPONSE_CACHE_TTL"]
+    )
+    on_invalidate(app.extensions["cache"], response_cache.handle_invalidation)
+    app.extensions["response_cache"] = response_cache
+
+
+def response_cache():
+    return current_app.extensions["response_cache"]
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, jsonify, g
+from app import db
+from app.database import read_replica
+from app.models.budget_alert_model import BudgetAlert
+from app.schemas import AlertQuerySchema
+from app.serializers import Fields
+from app.utils import validate_args
+from ..auth import jwt_required
+
+alerts_bp = Blueprint("alerts", __name__)
+
+ALERT_FIELDS = Fields(
+    alert_id=BudgetAlert.alert_id,
+    plan_id=BudgetAlert.plan_id,
+    kind=BudgetAlert.kind,
+    level=BudgetAlert.level,
+    spent=(BudgetAlert.spent, float),
+    amount=(BudgetAlert.amount, float),
+    created_at=(BudgetAlert.created_at, str)
+)
+
+
+# Cheap poll: GET /api/alerts?since=<cursor> returns only alerts raised after
+# the cursor (usually none) plus the cursor to send next time. Without
+# `since` it returns the latest `limit` alerts to start from.
+#
+# Transactions can commit out of alert_id order, so a lower id may still show
+# up after a higher one was seen. The cursor therefore only moves past alerts
+# older than ALERT_FEED_SETTLE seconds; newer ones are sent again on the next
+# poll, and clients skip alert_ids they have already shown.
+@alerts_bp.route("", methods=["GET"])
+@jwt_required
+@validate_args(AlertQuerySchema)
+@read_replica
+def get_alerts(validated):
+    user_id = g.current_user["user_id"]
+
+    stmt = ALERT_FIELDS.select().where(BudgetAlert.user_id == user_id)
+    if validated.since is None:
+        rows = db.session.execute(stmt.order_by(BudgetAlert.alert_id.desc()).limit(validated.limit)).all()
+        rows.reverse()
+    else:
+        rows = db.session.execute(
+            stmt.where(BudgetAlert.alert_id > validated.since).
+            order_by(BudgetAlert.alert_id).
+            limit(validated.limit)
+        ).all()
+
+    settled_before = datetime.utcnow() - timedelta(seconds=current_app.config["ALERT_FEED_SETTLE"])
+    if validated.since is not None:
+        floor = validated.since
+    else:
+        floor = rows[0].alert_id - 1 if rows else 0
+    cursor = max([row.alert_id for row in rows if row.created_at <= settled_before], default=floor)
+    cursor = max(cursor, floor)
+    return jsonify({
+        "alerts": ALERT_FIELDS.dump_all(rows),
+        "cursor": cursor,
+        # Only when the cursor moved, or a page of unsettled alerts would loop
+        "has_more": len(rows) == validated.limit and validated.since is not None and cursor > validated.since
+    }), 200
@@ -0,0 +1,193 @@
+import math
+from datetime import date, timedelta
+from flask import Blueprint, jsonify, g
+from app import db
+from app.models.budget_plan_model import BudgetPlan
+from app.models.category_model import Category
+from app.models.spend_rollup_model import SpendRollup
+from app.schemas import AnalyticsQuerySchema
+from app.utils import validate_args
+from ..auth import jwt_required
+
+analytics_bp = Blueprint("analytics", __name__)
+
+# Date formats used to bucket spend_rollups.day per SQL dialect. Weeks are
+# not here: SQLite has no ISO week, so they are grouped in Python (see iso_weeks)
+PERIOD_FORMATS = {
+    "mysql": {"day": "%Y-%m-%d", "month": "%Y-%m"},
+    "sqlite": {"day": "%Y-%m-%d", "month": "%Y-%m"},
+}
+
+
+def period_expression(column, bucket):
+    # SQL expression turning a date/datetime column into a bucket label
+    dialect = db.session.get_bind().dialect.name
+    fmt = PERIOD_FORMATS.get(dialect, PERIOD_FORMATS["mysql"])[bucket]
+    if dialect == "sqlite":
+        return db.func.strftime(fmt, column)
+    return db.func.date_format(column, fmt)
+
+
+def iso_weeks(rows):
+    # (day, total, count) rows in day order -> [(ISO week label, total, count)],
+    # labelled like MySQL's %x-W%v (weeks start on Monday, 2027-01-01 is in 2026-W53)
+    weeks = {}
+    for day, total, count in rows:
+        year, week, _ = day.isocalendar()
+        label = f"{year}-W{week:02d}"
+        week_total, week_count = weeks.get(label, (0, 0))
+        weeks[label] = (week_total + total, week_count + count)
+    return [(label, total, count) for label, (total, count) in weeks.items()]
+
+
+def filter_rollups(query, user_id, validated):
+    # Apply the shared analytics filters to a query over SpendRollup.
+    # The rollups hold one row per (plan, category, day), so every
+    # aggregate below reads O(days) rows instead of O(expenses).
+    query = query.filter(SpendRollup.user_id == user_id)
+    if validated.start_date:
+        query = query.filter(SpendRollup.day >= validated.start_date)
+    if validated.end_date:
+        query = query.filter(SpendRollup.day <= validated.end_date)
+    if validated.plan_id is not None:
+        query = query.filter(SpendRollup.plan_id == validated.plan_id)
+    if validated.category_id is not None:
+        query = query.filter(SpendRollup.category_id == validated.category_id)
+    return query
+
+
+# Spend per category
+@analytics_bp.route("/by_category", methods=["GET"])
+@jwt_required
+@validate_args(AnalyticsQuerySchema)
+def spend_by_category(validated):
+    user_id = g.current_user["user_id"]
+
+    query = db.session.query(
+        SpendRollup.category_id,
+        Category.name,
+        db.func.sum(SpendRollup.total),
+        db.func.sum(SpendRollup.expense_count)
+    ).join(Category, SpendRollup.category_id == Category.category_id)
+    rows = filter_rollups(query, user_id, validated).\
+        group_by(SpendRollup.category_id, Category.name).\
+        all()
+
+    return jsonify([
+        {"category_id": category_id, "category_name": name, "total": float(total), "count": int(count)}
+        for category_id, name, total, count in rows
+    ]), 200
+
+
+# Spend per plan
+@analytics_bp.route("/by_plan", methods=["GET"])
+@jwt_required
+@validate_args(AnalyticsQuerySchema)
+def spend_by_plan(validated):
+    user_id = g.current_user["user_id"]
+
+    query = db.session.query(
+        SpendRollup.plan_id,
+        db.func.sum(SpendRollup.total),
+        db.func.sum(SpendRollup.expense_count)
+    )
+    rows = filter_rollups(query, user_id, validated).\
+        group_by(SpendRollup.plan_id).\
+        all()
+
+    return jsonify([
+        {"plan_id": plan_id, "total": float(total), "count": int(count)}
+        for plan_id, total, count in rows
+    ]), 200
+
+
+# Spend per day, week or month
+@analytics_bp.route("/timeseries", methods=["GET"])
+@jwt_required
+@validate_args(AnalyticsQuerySchema)
+def spend_timeseries(validated):
+    user_id = g.current_user["user_id"]
+
+    # Weeks are summed in Python from the per-day rows (at most one per day)
+    if validated.bucket == "week":
+        period = SpendRollup.day
+    else:
+        period = period_expression(SpendRollup.day, validated.bucket).label("period")
+    query = db.session.query(
+        period,
+        db.func.sum(SpendRollup.total),
+        db.func.sum(SpendRollup.expense_count)
+    )
+    rows = filter_rollups(query, user_id, validated).\
+        group_by(period).\
+        order_by(period).\
+        all()
+    if validated.bucket == "week":
+        rows = iso_weeks(rows)
+
+    return jsonify({
+        "bucket": validated.bucket,
+        "series": [
+            {"period": label, "total": float(total), "count": int(count)}
+            for label, total, count in rows
+        ]
+    }), 200
+
+
+def burn_rate(plan_id, amount, spent, start_date, end_date, today):
+    # Average daily spend so far and the day the plan is projected to run out
+    amount = float(amount)
+    spent = float(spent or 0)
+    days_total = (end_date - start_date).days + 1
+    days_elapsed = (min(today, end_date) - start_date).days + 1
+    days_elapsed = max(0, min(days_elapsed, days_total))
+
+    daily_rate = spent / days_elapsed if days_elapsed else 0.0
+    projected_total = daily_rate * days_total
+
+    overspend_date = None
+    if spent >= amount and spent > 0:
+        overspend_date = min(today, end_date)
+    elif daily_rate > 0 and days_elapsed:
+        days_left = math.ceil((amount - spent) / daily_rate)
+        projected = max(today, start_date) + timedelta(days=days_left)
+        if projected <= end_date:
+            overspend_date = projected
+
+    return {
+        "plan_id": plan_id,
+        "amount": amount,
+        "spent": spent,
+        "days_elapsed": days_elapsed,
+        "days_total": days_total,
+        "daily_rate": round(daily_rate, 2),
+        "projected_total": round(projected_total, 2),
+        "projected_overspend_date": str(overspend_date) if overspend_date else None
+    }
+
+
+# Running burn rate and projected overspend date per plan
+@analytics_bp.route("/burn_rate", methods=["GET"])
+@jwt_required
+@validate_args(AnalyticsQuerySchema)
+def get_burn_rate(validated):
+    user_id = g.current_user["user_id"]
+
+    totals = filter_rollups(
+        db.session.query(SpendRollup.plan_id, db.func.sum(SpendRollup.total).label("spent")),
+        user_id, validated
+    ).group_by(SpendRollup.plan_id).subquery()
+
+    rows = db.session.query(
+        BudgetPlan.plan_id,
+        BudgetPlan.amount,
+        totals.c.spent,
+        BudgetPlan.start_date,
+        BudgetPlan.end_date
+    ).outerjoin(totals, totals.c.plan_id == BudgetPlan.plan_id).\
+        filter(BudgetPlan.user_id == user_id)
+    if validated.plan_id is not None:
+        rows = rows.filter(BudgetPlan.plan_id == validated.plan_id)
+
+    today = date.today()
+    return jsonify([burn_rate(*row, today=today) for row in rows.all()]), 200
@@ -1,12 +1,14 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask import Blueprint, jsonify, request, g
-from ..database import db
+from ..database import db, read_replica
 from ..models.user_model import User
 from ..utils import db_commit_or_rollback
 from ..database import db
-from ..schemas import RegisterSchema, LoginSchema
+from ..schemas import RegisterSchema, LoginSchema, RefreshSchema
 from ..utils import validate_json
-from ..auth import hash_password, verify_password, create_access_token, jwt_required
+from ..auth import hash_password, verify_password, password_needs_rehash, create_access_token, create_refresh_token, rotate_refresh_token, jwt_required
+from ..hashing import HashingBusy
+from ..versions import mark_changed, conditional
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -26,7 +28,8 @@ def register(validated):
     db.session.commit()
 
     token = create_access_token({"user_id": user.user_id})
-    return jsonify({"message": "registered", "user_id": user.user_id, "access_token": token}), 201
+    refresh_token = create_refresh_token({"user_id": user.user_id})
+    return jsonify({"message": "registered", "user_id": user.user_id, "access_token": token, "refresh_token": refresh_token}), 201
 
 @auth_bp.route("/login", methods=["POST"])
 @validate_json(LoginSchema)
@@ -38,8 +41,43 @@ def login(validated):
     if not user or not verify_password(user.password_hash, password):
         return jsonify({"error": "invalid_credentials"}), 401
 
+    # Upgrade hashes made with older/cheaper parameters while we have the password.
+    # The password is already checked, so a busy pool only postpones the upgrade
+    # to a later login instead of failing this one.
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hash_password(password)
+            db.session.commit()
+        except HashingBusy:
+            pass
+
     token = create_access_token({"user_id": user.user_id})
-    return jsonify({"message": "logged_in", "access_token": token, "user_id": user.user_id})
+    refresh_token = create_refresh_token({"user_id": user.user_id})
+    return jsonify({"message": "logged_in", "access_token": token, "refresh_token": refresh_token, "user_id": user.user_id})
+
+# Exchange a refresh token for a new access/refresh pair (the old one is revoked)
+@auth_bp.route("/refresh", methods=["POST"])
+@validate_json(RefreshSchema)
+def refresh(validated):
+    data = rotate_refresh_token(validated.refresh_token)
+    if data.get("error"):
+        return jsonify({"error": data["error"]}), 401
+
+    identity = data["sub"]
+    return jsonify({
+        "message": "refreshed",
+        "access_token": create_access_token(identity),
+        "refresh_token": create_refresh_token(identity)
+    }), 200
+
+# Revoke a refresh token so it can't be used again
+@auth_bp.route("/logout", methods=["POST"])
+@validate_json(RefreshSchema)
+def logout(validated):
+    data = rotate_refresh_token(validated.refresh_token)
+    if data.get("error") and data["error"] != "token_revoked":
+        return jsonify({"error": data["error"]}), 401
+    return jsonify({"message": "logged_out"}), 200
 
 
 # update profile info(email, username)
@@ -80,6 +118,7 @@ def update_profile():
     
     db.session.commit()
     
+    mark_changed("profile")
     return jsonify({
         "message": "profile_updated",
         "username": user.username,
@@ -138,6 +177,8 @@ def update_profile():
 
 @auth_bp.route("/profile", methods=["GET"])
 @jwt_required
+@conditional("profile")
+@read_replica
 def get_profile():
     user_id = g.current_user["user_id"]
     user = User.query.get(user_id)
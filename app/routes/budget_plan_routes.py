@@ -1,9 +1,18 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import select
 from app.models.budget_plan_model import BudgetPlan
+from app.models.spend_rollup_model import SpendRollup
+from app.models.expense_model import Expense
+from app.models.recurring_expense_model import RecurringExpense
+from app.models.budget_alert_model import BudgetAlert
+from app.alerts import queue_evaluation
 from app import db
+from app.database import read_replica
+from app.serializers import PLAN_FIELDS, list_response
 from flask import g
 from app.utils import validate_json
 from ..auth import jwt_required
+from ..versions import mark_changed, conditional
 from ..utils import db_commit_or_rollback
 from app.schemas import CreatePlanSchema
 from app.schemas import RegisterSchema, LoginSchema
@@ -22,31 +31,24 @@ def create_plan(validated):
         category_id=validated.category_id,
         amount=validated.amount,
         start_date=validated.start_date,
-        end_date=validated.end_date
+        end_date=validated.end_date,
+        auto_rollover=validated.auto_rollover
     )
     db.session.add(plan)
     db.session.flush()
+    mark_changed("plans")
     return jsonify({"message":"plan_created", "plan_id": plan.plan_id}), 201
 
 @budget_plans_bp.route("/budget_plans", methods=["GET"])
 @jwt_required
+@conditional("plans", cache=True)
+@read_replica
 def get_plans():
     user_id = g.current_user.get("user_id")
 
-    plans = BudgetPlan.query.filter_by(user_id=user_id).all()
+    rows = db.session.execute(PLAN_FIELDS.select().where(BudgetPlan.user_id == user_id)).all()
 
-    result = []
-    for p in plans:
-        result.append({
-            "plan_id": p.plan_id,
-            "category_id": p.category_id,
-            "amount": float(p.amount),
-            "spent": float(p.spent),
-            "start_date": str(p.start_date),
-            "end_date": str(p.end_date)
-        })
-
-    return jsonify(result)
+    return list_response(PLAN_FIELDS, rows)
 
 
 
@@ -55,19 +57,14 @@ def get_plans():
 def get_single_plan(plan_id):
     user_id = g.current_user.get("user_id")
 
-    plan = BudgetPlan.query.filter_by(plan_id=plan_id, user_id=user_id).first()
+    row = db.session.execute(
+        PLAN_FIELDS.select().where(BudgetPlan.plan_id == plan_id, BudgetPlan.user_id == user_id)
+    ).first()
 
-    if not plan:
+    if not row:
         return jsonify({"error": "not_found", "message": "Plan not found"}), 404
 
-    return jsonify({
-        "plan_id": plan.plan_id,
-        "category_id": plan.category_id,
-        "amount": float(plan.amount),
-        "spent": float(plan.spent),
-        "start_date": str(plan.start_date),
-        "end_date": str(plan.end_date)
-    }), 200
+    return jsonify(PLAN_FIELDS.dump(row)), 200
 
 
 
@@ -92,7 +89,12 @@ def update_plan(plan_id):
         plan.start_date = data["start_date"]
     if "end_date" in data:
         plan.end_date = data["end_date"]
+    if "auto_rollover" in data:
+        plan.auto_rollover = bool(data["auto_rollover"])
+    if {"amount", "start_date", "end_date"} & data.keys():
+        queue_evaluation(plan.plan_id)
 
+    mark_changed("plans")
     return jsonify({"message": "plan_updated"}), 200
 
 
@@ -102,18 +104,21 @@ def update_plan(plan_id):
 def delete_plan(plan_id):
     user_id = g.current_user.get("user_id")
     
-    # Get the plan (this will load expenses due to relationship)
     plan = BudgetPlan.query.filter_by(plan_id=plan_id, user_id=user_id).first()
 
     if not plan:
         return jsonify({"error": "not_found", "message": "Plan not found"}), 404
 
-    # Get expense count from the relationship
-    expense_count = len(plan.expenses)
+    # COUNT in SQL instead of loading every expense through the relationship
+    expense_count = db.session.query(db.func.count(Expense.expense_id)).filter(Expense.plan_id == plan_id).scalar()
     
     # Database will handle cascade delete of expenses
+    SpendRollup.query.filter_by(plan_id=plan_id).delete(synchronize_session=False)
+    RecurringExpense.query.filter_by(plan_id=plan_id).delete(synchronize_session=False)
+    BudgetAlert.query.filter_by(plan_id=plan_id).delete(synchronize_session=False)
     db.session.delete(plan)
     
+    mark_changed("plans", "expenses")
     return jsonify({
         "message": "plan_deleted",
         "plan_id": plan_id,
@@ -122,9 +127,12 @@ def delete_plan(plan_id):
 
 @budget_plans_bp.route("/budget_plans/<int:plan_id>/remaining", methods=["GET"])
 @jwt_required
+@conditional("plans", cache=True)
 def get_remaining(plan_id):
     user_id = g.current_user.get("user_id")
-    plan = BudgetPlan.query.filter_by(plan_id=plan_id, user_id=user_id).first()
+    plan = db.session.execute(
+        select(BudgetPlan.amount, BudgetPlan.spent).where(BudgetPlan.plan_id == plan_id, BudgetPlan.user_id == user_id)
+    ).first()
 
     if not plan:
         return jsonify({"error": "not_found", "message": "Plan not found"}), 404
@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify, g  # Make sure 'g' is imported
 from app.models.category_model import Category
 from app import db
+from app.database import read_replica
+from app.serializers import CATEGORY_FIELDS, list_response
 from app.schemas import CategorySchema
 from app.utils import validate_json
 from ..auth import jwt_required  # Change from token_required to jwt_required
+from ..versions import mark_changed, conditional
 
 categories_bp = Blueprint("categories", __name__)
 
@@ -30,6 +33,7 @@ def create_category(validated):  # Remove current_user parameter
     db.session.add(category)
     db.session.commit()
 
+    mark_changed("categories")
     return jsonify({
         "message": "category_created",
         "category_id": category.category_id
@@ -38,38 +42,32 @@ def create_category(validated):  # Remove current_user parameter
 # Get all categories
 @categories_bp.route("/categories", methods=["GET"])
 @jwt_required  # Changed to jwt_required
+@conditional("categories", cache=True)
+@read_replica
 def get_categories():
     user_id = g.current_user["user_id"]  # Get user_id from g.current_user
-    categories = Category.query.filter_by(user_id=user_id).all()
-    return jsonify([
-        {"category_id": c.category_id, "name": c.name, "description": c.description}
-        for c in categories
-    ])
+    rows = db.session.execute(CATEGORY_FIELDS.select().where(Category.user_id == user_id)).all()
+    return list_response(CATEGORY_FIELDS, rows)
 
 # GET SINGLE CATEGORY
 @categories_bp.route("/categories/<int:category_id>", methods=["GET"])
 @jwt_required  # Changed to jwt_required
 def get_single_category(category_id):
     user_id = g.current_user["user_id"]  # Get user_id from g.current_user
-    category = Category.query.filter_by(
-        category_id=category_id,
-        user_id=user_id
+    row = db.session.execute(
+        CATEGORY_FIELDS.select().where(Category.category_id == category_id, Category.user_id == user_id)
     ).first()
 
-    if not category:
+    if not row:
         return jsonify({"error": "Category not found"}), 404
 
-    return jsonify({
-        "category_id": category.category_id,
-        "name": category.name,
-        "description": category.description
-    })
+    return jsonify(CATEGORY_FIELDS.dump(row))
 
 # UPDATE CATEGORY
 @categories_bp.route("/categories/<int:category_id>", methods=["PUT"])
 @jwt_required  # Changed to jwt_required
 @validate_json(CategorySchema)
-def update_category(category_id, validated):  # Remove current_user parameter
+def update_category(validated, category_id):  # validate_json passes validated first
     user_id = g.current_user["user_id"]  # Get user_id from g.current_user
     category = Category.query.filter_by(
         category_id=category_id,
@@ -94,6 +92,7 @@ def update_category(category_id, validated):  # Remove current_user parameter
 
     db.session.commit()
 
+    mark_changed("categories")
     return jsonify({"message": "category_updated"}), 200
 
 # DELETE CATEGORY
@@ -130,4 +129,5 @@ def delete_category(category_id):
     db.session.delete(category)
     db.session.commit()
 
+    mark_changed("categories")
     return jsonify({"message": "category_deleted"}), 200
\ No newline at end of file
@@ -0,0 +1,90 @@
+from flask import Blueprint, request, jsonify, g, current_app
+from app import db
+from app.models.user_model import User
+from app.models.category_model import Category
+from app.models.budget_plan_model import BudgetPlan
+from app.models.expense_model import Expense
+from ..auth import jwt_required
+from ..serializers import CATEGORY_FIELDS, EXPENSE_FIELDS, PLAN_FIELDS, columnar, expenses_with_category, wants_columns
+from ..utils import encode_cursor
+from ..versions import COLLECTIONS, conditional
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+MAX_RECENT_EXPENSES = 500
+
+DASHBOARD_PLAN_FIELDS = PLAN_FIELDS.extend(category_name=Category.name)
+
+
+# Everything the frontend needs on page load in one round trip:
+# profile, categories, plans (with category names and remaining budget),
+# the most recent expenses and the total expense count, plus the
+# /api/expenses/expenses cursor for the page after them (null when none).
+# Always runs the same five queries no matter how much data the user has.
+# ?format=columns sends the lists in the compact columnar form.
+@dashboard_bp.route("", methods=["GET"])
+@jwt_required
+@conditional(*COLLECTIONS, cache=True)
+def get_dashboard():
+    user_id = g.current_user["user_id"]
+
+    recent = request.args.get("recent", type=int)
+    if recent is None:
+        recent = current_app.config["DASHBOARD_RECENT_EXPENSES"]
+    recent = max(0, min(recent, MAX_RECENT_EXPENSES))
+
+    user = db.session.query(User.user_id, User.username, User.email).\
+        filter(User.user_id == user_id).\
+        first()
+    if not user:
+        return jsonify({"error": "not_found", "message": "User not found"}), 404
+
+    categories = db.session.execute(CATEGORY_FIELDS.select().where(Category.user_id == user_id)).all()
+
+    plan_stmt = DASHBOARD_PLAN_FIELDS.select().\
+        join(Category, BudgetPlan.category_id == Category.category_id).\
+        where(BudgetPlan.user_id == user_id)
+    plans = db.session.execute(plan_stmt).all()
+
+    expense_stmt = expenses_with_category().\
+        where(Expense.user_id == user_id).\
+        order_by(Expense.expense_date.desc(), Expense.expense_id.desc()).\
+        limit(recent)
+    expenses = db.session.execute(expense_stmt).all()
+
+    expense_count = db.session.query(db.func.count(Expense.expense_id)).\
+        filter(Expense.user_id == user_id).\
+        scalar()
+
+    expenses_cursor = None
+    if expenses and expense_count > len(expenses):
+        last = expenses[-1]
+        expenses_cursor = encode_cursor(last.expense_date.isoformat(), last.expense_id)
+
+    plan_list = DASHBOARD_PLAN_FIELDS.dump_all(plans)
+    for plan in plan_list:
+        amount = plan["amount"]
+        spent = plan["spent"] = plan["spent"] or 0.0
+        plan["remaining"] = amount - spent
+        plan["percent_used"] = round(spent / amount * 100, 1) if amount else 0.0
+
+    if wants_columns():
+        category_list = CATEGORY_FIELDS.dump_columns(categories)
+        plan_list = columnar(plan_list)
+        expense_list = EXPENSE_FIELDS.dump_columns(expenses)
+    else:
+        category_list = CATEGORY_FIELDS.dump_all(categories)
+        expense_list = EXPENSE_FIELDS.dump_all(expenses)
+
+    return jsonify({
+        "profile": {
+            "user_id": user.user_id,
+            "username": user.username,
+            "email": user.email
+        },
+        "categories": category_list,
+        "budget_plans": plan_list,
+        "recent_expenses": expense_list,
+        "expense_count": expense_count,
+        "expenses_cursor": expenses_cursor
+    }), 200
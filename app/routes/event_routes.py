@@ -0,0 +1,53 @@
+import json
+import time
+from flask import Blueprint, Response, current_app, g
+from ..auth import jwt_required_query
+from ..events import event_broker
+
+events_bp = Blueprint("events", __name__)
+
+
+def _format(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+# Server-sent events: one long-lived response per open tab, fed by the
+# in-process broker. The generator only uses values captured up front, so
+# the request and app contexts (and any pooled DB connection) are released
+# as soon as headers go out; run it under a cooperative worker (see
+# gunicorn.conf.py) so an idle stream holds no OS thread either.
+# Streams end after SSE_MAX_DURATION and EventSource reconnects on its own.
+@events_bp.route("/stream", methods=["GET"])
+@jwt_required_query
+def stream():
+    user_id = g.current_user["user_id"]
+    config = current_app.config
+    heartbeat = config["SSE_HEARTBEAT"]
+    deadline = time.monotonic() + config["SSE_MAX_DURATION"]
+    broker = event_broker()
+
+    def generate():
+        # Subscribed only once the body is actually sent: a HEAD request or a
+        # client gone before the first chunk never starts the generator, and
+        # its finally would never run to unsubscribe
+        subscription = broker.subscribe(user_id)
+        try:
+            # Reconnect quickly after a deliberate close; "ready" lets the
+            # client reload anything it missed while disconnected
+            yield "retry: 2000\n" + _format("ready", {})
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=heartbeat)
+                if subscription.lagged:
+                    subscription.reset()
+                    yield _format("resync", {})
+                elif event is None:
+                    yield ": keep-alive\n\n"
+                else:
+                    yield _format(event["type"], event["data"])
+        finally:
+            broker.unsubscribe(user_id, subscription)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # nginx: pass events through unbuffered
+    return response
@@ -1,14 +1,31 @@
-from flask import Blueprint, request, jsonify, g
+import csv
+import logging
+from collections import defaultdict
+from flask import Blueprint, request, jsonify, g, current_app, Response, stream_with_context
+from pydantic import ValidationError
+from sqlalchemy import insert, select
 from app.models.expense_model import Expense
 from app.models.budget_plan_model import BudgetPlan
 from app import db
+from app.database import read_replica
 from app.models.category_model import Category
-from app.utils import db_commit_or_rollback, validate_json
-from app.schemas import AddExpenseSchema
+from app.utils import db_commit_or_rollback, validate_json, validate_args, encode_cursor, decode_cursor
+from app.schemas import AddExpenseSchema, ExpenseQuerySchema, ImportExpenseRowSchema
+from app.serializers import EXPENSE_FIELDS, expenses_with_category, list_response
+from app.expense_io import detect_format, iter_csv_rows, iter_ndjson_rows, batched, csv_chunks, ndjson_chunks
 from ..auth import jwt_required
+from ..versions import mark_changed, conditional
+from ..events import emit
+from ..spending import RollupBatch, record_expense, forget_expense, adjust_plan_spent
+from datetime import datetime, timedelta
 from decimal import Decimal
 
+# Plan listings omit plan_id; single expenses omit the category name (no join)
+PLAN_EXPENSE_FIELDS = EXPENSE_FIELDS.exclude("plan_id")
+SINGLE_EXPENSE_FIELDS = EXPENSE_FIELDS.exclude("category_name")
+
 expenses_bp = Blueprint("expenses", __name__)
+logger = logging.getLogger(__name__)
 
 @expenses_bp.route("/expenses", methods=["POST"])
 @jwt_required
@@ -23,10 +40,11 @@ def add_expense(validated):
     expense_date = validated.expense_date  # ADD THIS
 
     # Ensure plan belongs to this user
-    plan = BudgetPlan.query.filter_by(plan_id=plan_id, user_id=user_id).first()
-    if not plan:
+    category_id = db.session.query(BudgetPlan.category_id).\
+        filter_by(plan_id=plan_id, user_id=user_id).\
+        scalar()
+    if category_id is None:
         return jsonify({"error": "forbidden", "message": "Plan does not belong to this user"}), 403
-    category_id = plan.category_id
     expense = Expense(
         user_id=user_id,
         plan_id=plan_id,
@@ -38,65 +56,235 @@ def add_expense(validated):
     db.session.add(expense)
     db.session.flush()
 
-    # Update plan spent safely
-    plan.spent = plan.spent + amount
+    # Update plan spent atomically in the database
+    adjust_plan_spent(plan_id, amount)
+    record_expense(expense)
 
+    mark_changed("expenses", "plans")
+    emit(user_id, "expense.created", expense_id=expense.expense_id, plan_id=plan_id, amount=float(amount))
     return jsonify({
         "message": "expense_added",
         "expense_id": expense.expense_id
     }), 201
 
-# get all expense
+# ========================= BULK IMPORT =========================
+# Streams a CSV (header: plan_id,amount,description,expense_date) or NDJSON body.
+# Rows are validated and inserted in batches; plan ownership is resolved once
+# per distinct plan and spent/rollups are updated once at the end.
+@expenses_bp.route("/expenses/import", methods=["POST"])
+@jwt_required
+@db_commit_or_rollback
+def import_expenses():
+    user_id = g.current_user["user_id"]
+
+    fmt = detect_format(request.mimetype, request.args.get("format"))
+    if fmt is None:
+        return jsonify({
+            "error": "unsupported_media_type",
+            "message": "Send text/csv or application/x-ndjson"
+        }), 415
+
+    if fmt == "csv":
+        rows = iter_csv_rows(request.stream)
+    else:
+        rows = iter_ndjson_rows(request.stream)
+
+    batch_size = current_app.config["IMPORT_BATCH_SIZE"]
+    max_errors = current_app.config["IMPORT_MAX_ERRORS"]
+
+    plan_categories = {}  # plan_id -> category_id, None when not owned by the user
+    spent = defaultdict(Decimal)
+    rollups = RollupBatch()
+    errors = []
+    failed = 0
+    imported = 0
+
+    def reject(row_number, error, details=None):
+        nonlocal failed
+        failed += 1
+        if len(errors) < max_errors:
+            report = {"row": row_number, "error": error}
+            if details is not None:
+                report["details"] = details
+            errors.append(report)
+
+    try:
+        for batch in batched(rows, batch_size):
+            valid = []
+            for row_number, payload in batch:
+                if isinstance(payload, str):
+                    reject(row_number, payload)
+                    continue
+                try:
+                    valid.append((row_number, ImportExpenseRowSchema(**payload)))
+                except ValidationError as e:
+                    reject(row_number, "validation_error", e.errors())
+
+            unknown = {v.plan_id for _, v in valid if v.plan_id not in plan_categories}
+            if unknown:
+                owned = db.session.query(BudgetPlan.plan_id, BudgetPlan.category_id).\
+                    filter(BudgetPlan.user_id == user_id, BudgetPlan.plan_id.in_(unknown)).\
+                    all()
+                plan_categories.update(dict.fromkeys(unknown))
+                plan_categories.update(dict(owned))
+
+            records = []
+            for row_number, v in valid:
+                category_id = plan_categories[v.plan_id]
+                if category_id is None:
+                    reject(row_number, "forbidden")
+                    continue
+                records.append({
+                    "user_id": user_id,
+                    "plan_id": v.plan_id,
+                    "category_id": category_id,
+                    "amount": v.amount,
+                    "description": v.description,
+                    "expense_date": v.expense_date
+                })
+                spent[v.plan_id] += v.amount
+                rollups.add(user_id, v.plan_id, category_id, v.expense_date, v.amount)
+
+            if records:
+                db.session.execute(insert(Expense), records)
+                imported += len(records)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({"error": "bad_request", "message": "Body must be UTF-8"}), 400
+    except csv.Error as e:
+        db.session.rollback()
+        return jsonify({"error": "bad_request", "message": f"Malformed CSV: {e}"}), 400
+
+    rollups.apply()
+    for plan_id, total in spent.items():
+        adjust_plan_spent(plan_id, total)
+
+    logger.info("expenses imported", extra={"user_id": user_id, "format": fmt, "imported": imported, "failed": failed})
+
+    mark_changed("expenses", "plans")
+    if imported:
+        emit(user_id, "expenses.created", count=imported, source="import")
+    return jsonify({
+        "message": "expenses_imported",
+        "imported": imported,
+        "failed": failed,
+        "errors": errors
+    }), 200 if imported or not failed else 400
+
+# get all expense (newest first, keyset paginated)
 
 @expenses_bp.route("/expenses", methods=["GET"])
 @jwt_required
-def get_expenses():
+@conditional("expenses", "categories")
+@validate_args(ExpenseQuerySchema)
+@read_replica
+def get_expenses(validated):
     user_id = g.current_user["user_id"]
     
     # Join with categories to get category names
-    expenses = db.session.query(Expense, Category).\
-        join(Category, Expense.category_id == Category.category_id).\
-        filter(Expense.user_id == user_id).\
-        all()
-
-    result = []
-    for expense, category in expenses:
-        result.append({
-            "expense_id": expense.expense_id,
-            "plan_id": expense.plan_id,
-            "category_id": expense.category_id,
-            "category_name": category.name,  # Add category name
-            "amount": float(expense.amount),
-            "description": expense.description,
-            "expense_date": str(expense.expense_date)
-        })
-
-    return jsonify(result), 200
+    stmt = expenses_with_category().where(Expense.user_id == user_id)
+
+    if validated.start_date:
+        stmt = stmt.where(Expense.expense_date >= validated.start_date)
+    if validated.end_date:
+        stmt = stmt.where(Expense.expense_date < validated.end_date + timedelta(days=1))
+    if validated.category_id is not None:
+        stmt = stmt.where(Expense.category_id == validated.category_id)
+    if validated.plan_id is not None:
+        stmt = stmt.where(Expense.plan_id == validated.plan_id)
+    if validated.min_amount is not None:
+        stmt = stmt.where(Expense.amount >= validated.min_amount)
+    if validated.max_amount is not None:
+        stmt = stmt.where(Expense.amount <= validated.max_amount)
+    if validated.q:
+        stmt = stmt.where(Expense.description.contains(validated.q, autoescape=True))
+
+    # Seek past the last row of the previous page instead of using OFFSET
+    if validated.cursor:
+        values = decode_cursor(validated.cursor)
+        try:
+            last_date = datetime.fromisoformat(values[0])
+            last_id = int(values[1])
+        except (TypeError, ValueError, IndexError):
+            return jsonify({"error": "invalid_cursor"}), 400
+        stmt = stmt.where(
+            (Expense.expense_date < last_date) |
+            ((Expense.expense_date == last_date) & (Expense.expense_id < last_id))
+        )
+
+    rows = db.session.execute(
+        stmt.order_by(Expense.expense_date.desc(), Expense.expense_id.desc()).limit(validated.limit + 1)
+    ).all()
+
+    has_more = len(rows) > validated.limit
+    rows = rows[:validated.limit]
+
+    response = list_response(EXPENSE_FIELDS, rows)
+    if has_more:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.expense_date.isoformat(), last.expense_id)
+    return response, 200
+
+# ========================= STREAMING EXPORT =========================
+# Streams the user's whole history as CSV or NDJSON. Rows come from a
+# server-side cursor (yield_per) and are encoded chunk by chunk, so memory
+# stays flat no matter how many expenses are exported.
+@expenses_bp.route("/export", methods=["GET"])
+@jwt_required
+def export_expenses():
+    user_id = g.current_user["user_id"]
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "bad_request", "message": "format must be csv or ndjson"}), 400
+
+    stmt = select(
+        Expense.expense_id,
+        Expense.plan_id,
+        Expense.category_id,
+        Category.name,
+        Expense.amount,
+        Expense.description,
+        Expense.expense_date
+    ).join(Category, Expense.category_id == Category.category_id).\
+        where(Expense.user_id == user_id).\
+        order_by(Expense.expense_date, Expense.expense_id).\
+        execution_options(yield_per=current_app.config["EXPORT_BATCH_SIZE"])
+
+    def generate():
+        rows = db.session.execute(stmt)
+        try:
+            if fmt == "csv":
+                yield from csv_chunks(rows)
+            else:
+                yield from ndjson_chunks(rows)
+        finally:
+            rows.close()
+
+    if fmt == "csv":
+        mimetype, filename = "text/csv", "expenses.csv"
+    else:
+        mimetype, filename = "application/x-ndjson", "expenses.ndjson"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
 # Get expense for specific plan
 
 @expenses_bp.route("expenses/<int:plan_id>", methods=["GET"])
 @jwt_required
+@conditional("expenses", "categories", cache=True)
 def get_expenses_by_plan(plan_id):
     user_id = g.current_user["user_id"]
 
-    expenses = db.session.query(Expense, Category).\
-        join(Category, Expense.category_id == Category.category_id).\
-        filter(Expense.plan_id == plan_id, Expense.user_id == user_id).\
-        all()
-
-    result = []
-    for expense, category in expenses:
-        result.append({
-            "expense_id": expense.expense_id,
-            "category_id": expense.category_id,
-            "category_name": category.name,  # Add category name
-            "amount": float(expense.amount),
-            "description": expense.description,
-            "expense_date": str(expense.expense_date)
-        })
+    rows = db.session.execute(
+        expenses_with_category(PLAN_EXPENSE_FIELDS).where(Expense.plan_id == plan_id, Expense.user_id == user_id)
+    ).all()
 
-    return jsonify(result), 200
+    return list_response(PLAN_EXPENSE_FIELDS, rows), 200
 
 
 # ========================= GET SINGLE EXPENSE =========================
@@ -105,19 +293,14 @@ def get_expenses_by_plan(plan_id):
 def get_single_expense(expense_id):
     user_id = g.current_user["user_id"]
 
-    expense = Expense.query.filter_by(expense_id=expense_id, user_id=user_id).first()
+    row = db.session.execute(
+        SINGLE_EXPENSE_FIELDS.select().where(Expense.expense_id == expense_id, Expense.user_id == user_id)
+    ).first()
 
-    if not expense:
+    if not row:
         return jsonify({"error": "not_found", "message": "Expense not found"}), 404
 
-    return jsonify({
-        "expense_id": expense.expense_id,
-        "plan_id": expense.plan_id,
-        "category_id": expense.category_id,
-        "amount": float(expense.amount),
-        "description": expense.description,
-        "expense_date": str(expense.expense_date)
-    }), 200
+    return jsonify(SINGLE_EXPENSE_FIELDS.dump(row)), 200
 
 
 # ========================= UPDATE EXPENSE =========================
@@ -128,29 +311,38 @@ def update_expense(expense_id):
     user_id = g.current_user["user_id"]
     data = request.get_json()
 
-    expense = Expense.query.filter_by(expense_id=expense_id, user_id=user_id).first()
+    # Lock the row so concurrent edits of the same expense see each other's amount
+    expense = Expense.query.filter_by(expense_id=expense_id, user_id=user_id).with_for_update().first()
     if not expense:
         return jsonify({"error": "not_found", "message": "Expense not found"}), 404
+
+    # Move the old values out of the rollups before anything changes
+    rollups = RollupBatch()
+    rollups.remove(expense.user_id, expense.plan_id, expense.category_id, expense.expense_date, expense.amount)
+
      # ADD THIS LINE to handle expense_date updates:
     if "expense_date" in data:
         expense.expense_date = data["expense_date"]
 
-    # Restore old amount to plan.spent
     old_amount = expense.amount
-    plan = BudgetPlan.query.filter_by(plan_id=expense.plan_id, user_id=user_id).first()
-    plan.spent = plan.spent - old_amount
 
     # Apply updates
     expense.category_id = data.get("category_id", expense.category_id)
     expense.description = data.get("description", expense.description)
 
     if "amount" in data:
-        new_amount = Decimal(data["amount"])
-        expense.amount = new_amount
-        plan.spent = plan.spent + new_amount
+        expense.amount = Decimal(data["amount"])
+
+    # Apply only the difference to plan.spent
+    adjust_plan_spent(expense.plan_id, expense.amount - old_amount)
+
+    rollups.add(expense.user_id, expense.plan_id, expense.category_id, expense.expense_date, expense.amount)
+    rollups.apply()
 
     db.session.flush()
 
+    mark_changed("expenses", "plans")
+    emit(user_id, "expense.updated", expense_id=expense_id, plan_id=expense.plan_id, amount=float(expense.amount))
     return jsonify({"message": "expense_updated"}), 200
 
 
@@ -161,15 +353,18 @@ def update_expense(expense_id):
 def delete_expense(expense_id):
     user_id = g.current_user["user_id"]
 
-    expense = Expense.query.filter_by(expense_id=expense_id, user_id=user_id).first()
+    # Lock the row so two concurrent deletes can't both deduct it
+    expense = Expense.query.filter_by(expense_id=expense_id, user_id=user_id).with_for_update().first()
 
     if not expense:
         return jsonify({"error": "not_found", "message": "Expense not found"}), 404
 
     # Deduct from plan.spent
-    plan = BudgetPlan.query.filter_by(plan_id=expense.plan_id, user_id=user_id).first()
-    plan.spent = plan.spent - expense.amount
+    adjust_plan_spent(expense.plan_id, -expense.amount)
+    forget_expense(expense)
 
     db.session.delete(expense)
 
+    mark_changed("expenses", "plans")
+    emit(user_id, "expense.deleted", expense_id=expense_id, plan_id=expense.plan_id)
     return jsonify({"message": "expense_deleted"}), 200
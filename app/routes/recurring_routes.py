@@ -0,0 +1,80 @@
+from flask import Blueprint, jsonify, g
+from app import db
+from app.models.budget_plan_model import BudgetPlan
+from app.models.recurring_expense_model import RecurringExpense
+from app.schemas import RecurringExpenseSchema
+from app.serializers import Fields, list_response
+from app.utils import validate_json
+from ..auth import jwt_required
+from ..utils import db_commit_or_rollback
+
+recurring_bp = Blueprint("recurring", __name__)
+
+RECURRING_FIELDS = Fields(
+    recurring_id=RecurringExpense.recurring_id,
+    plan_id=RecurringExpense.plan_id,
+    amount=(RecurringExpense.amount, float),
+    description=RecurringExpense.description,
+    frequency=RecurringExpense.frequency,
+    interval=RecurringExpense.interval,
+    start_date=(RecurringExpense.start_date, str),
+    end_date=(RecurringExpense.end_date, str),
+    next_date=(RecurringExpense.next_date, str),
+    occurrences=RecurringExpense.occurrences,
+    active=RecurringExpense.active
+)
+
+
+# Expenses are created by the scheduler (`flask scheduler run`), not here;
+# a start_date in the past is caught up on its next run.
+@recurring_bp.route("", methods=["POST"])
+@validate_json(RecurringExpenseSchema)
+@jwt_required
+@db_commit_or_rollback
+def create_recurring(validated):
+    user_id = g.current_user["user_id"]
+
+    plan = BudgetPlan.query.filter_by(plan_id=validated.plan_id, user_id=user_id).first()
+    if not plan:
+        return jsonify({"error": "not_found", "message": "Plan not found"}), 404
+
+    template = RecurringExpense(
+        user_id=user_id,
+        plan_id=plan.plan_id,
+        amount=validated.amount,
+        description=validated.description,
+        frequency=validated.frequency,
+        interval=validated.interval,
+        start_date=validated.start_date,
+        end_date=validated.end_date,
+        next_date=validated.start_date
+    )
+    db.session.add(template)
+    db.session.flush()
+    return jsonify({"message": "recurring_created", "recurring_id": template.recurring_id}), 201
+
+
+@recurring_bp.route("", methods=["GET"])
+@jwt_required
+def get_recurring():
+    user_id = g.current_user["user_id"]
+    rows = db.session.execute(
+        RECURRING_FIELDS.select().
+        where(RecurringExpense.user_id == user_id).
+        order_by(RecurringExpense.recurring_id)
+    ).all()
+    return list_response(RECURRING_FIELDS, rows)
+
+
+# Stops future occurrences; expenses already created are kept
+@recurring_bp.route("/<int:recurring_id>", methods=["DELETE"])
+@jwt_required
+@db_commit_or_rollback
+def delete_recurring(recurring_id):
+    user_id = g.current_user["user_id"]
+    template = RecurringExpense.query.filter_by(recurring_id=recurring_id, user_id=user_id).first()
+    if not template:
+        return jsonify({"error": "not_found", "message": "Recurring expense not found"}), 404
+
+    db.session.delete(template)
+    return jsonify({"message": "recurring_deleted", "recurring_id": recurring_id}), 200
@@ -0,0 +1,261 @@
+import calendar
+import logging
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import insert, select
+from .alerts import AS_OF_KEY
+from .database import db
+from .events import emit
+from .models.budget_plan_model import BudgetPlan
+from .models.expense_model import Expense
+from .models.recurring_expense_model import RecurringExpense
+from .spending import RollupBatch, adjust_plan_spent
+from .versions import bump_versions
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def add_months(day, months):
+    # Same day of month, clamped to the month's last day (Jan 31 + 1 -> Feb 28/29)
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrence_date(template, n):
+    # Always computed from start_date so monthly clamping never drifts
+    step = n * template.interval
+    if template.frequency == "daily":
+        return template.start_date + timedelta(days=step)
+    if template.frequency == "weekly":
+        return template.start_date + timedelta(weeks=step)
+    return add_months(template.start_date, step)
+
+
+def next_period(plan):
+    # Plans covering whole calendar months roll over to the next whole months
+    # (Jan -> Feb, not Feb 1 - Mar 3); anything else keeps its length in days
+    start = plan.end_date + timedelta(days=1)
+    if plan.start_date.day == 1 and start.day == 1:
+        months = (start.year - plan.start_date.year) * 12 + start.month - plan.start_date.month
+        return start, add_months(start, months) - timedelta(days=1)
+    return start, start + (plan.end_date - plan.start_date)
+
+
+def recurrence_key(template, day):
+    return f"{template.recurring_id}:{day.isoformat()}"
+
+
+def _lock_batch(query, batch_size):
+    # Nodes running the scheduler at the same time skip each other's rows
+    # instead of waiting on them (no-op on SQLite, which has no row locks)
+    return query.with_for_update(skip_locked=True).limit(batch_size).all()
+
+
+def roll_over_plans(today, batch_size):
+    """Open the follow-up period of every ended auto_rollover plan.
+    Returns {user_id: plans created}."""
+    created = defaultdict(int)
+    while True:
+        plans = _lock_batch(
+            BudgetPlan.query.filter(BudgetPlan.auto_rollover.is_(True), BudgetPlan.end_date < today).
+            order_by(BudgetPlan.plan_id),
+            batch_size
+        )
+        if not plans:
+            break
+        succeeded = set(db.session.scalars(
+            select(BudgetPlan.rolled_from_plan_id).
+            where(BudgetPlan.rolled_from_plan_id.in_([p.plan_id for p in plans]))
+        ))
+        records = []
+        for plan in plans:
+            # The successor carries the flag on; this plan is done either way
+            plan.auto_rollover = False
+            if plan.plan_id in succeeded:
+                continue
+            start, end = next_period(plan)
+            records.append({
+                "user_id": plan.user_id,
+                "category_id": plan.category_id,
+                "amount": plan.amount,
+                "spent": 0,
+                "start_date": start,
+                "end_date": end,
+                "created_at": datetime.utcnow(),
+                "auto_rollover": True,
+                "rolled_from_plan_id": plan.plan_id
+            })
+            created[plan.user_id] += 1
+        if records:
+            db.session.execute(insert(BudgetPlan), records)
+        db.session.commit()
+    return created
+
+
+def _current_plans(plan_ids):
+    # plan_id -> the plan itself, or its newest rolled-over successor
+    plans = {p.plan_id: p for p in BudgetPlan.query.filter(BudgetPlan.plan_id.in_(plan_ids))}
+    successors = {}
+    frontier = list(plans)
+    while frontier:
+        rows = BudgetPlan.query.filter(BudgetPlan.rolled_from_plan_id.in_(frontier)).all()
+        for plan in rows:
+            successors[plan.rolled_from_plan_id] = plan
+        frontier = [plan.plan_id for plan in rows]
+    return plans, successors
+
+
+def _plan_for(plan, successors, day):
+    while day > plan.end_date and plan.plan_id in successors:
+        plan = successors[plan.plan_id]
+    return plan
+
+
+def materialize_recurring(today, batch_size):
+    """Create every expense that recurring templates owe up to `today`.
+    Returns {user_id: expenses created}."""
+    created = defaultdict(int)
+    while True:
+        templates = _lock_batch(
+            RecurringExpense.query.filter(RecurringExpense.active.is_(True), RecurringExpense.next_date <= today).
+            order_by(RecurringExpense.next_date, RecurringExpense.recurring_id),
+            batch_size
+        )
+        if not templates:
+            break
+        plans, successors = _current_plans({t.plan_id for t in templates})
+
+        due = []
+        for template in templates:
+            plan = plans.get(template.plan_id)
+            if plan is None:
+                template.active = False
+                continue
+            n = template.occurrences
+            day = occurrence_date(template, n)
+            while day <= today and (template.end_date is None or day <= template.end_date):
+                plan = _plan_for(plan, successors, day)
+                due.append((template, plan, day))
+                n += 1
+                day = occurrence_date(template, n)
+            # Follow rollovers so the template keeps filling the current period
+            template.plan_id = plan.plan_id
+            template.occurrences = n
+            template.next_date = day
+            if template.end_date is not None and day > template.end_date:
+                template.active = False
+
+        # Unique recurrence keys make reruns harmless: skip anything already created
+        keys = [recurrence_key(template, day) for template, _, day in due]
+        existing = set(db.session.scalars(select(Expense.recurrence_key).where(Expense.recurrence_key.in_(keys)))) \
+            if keys else set()
+
+        records = []
+        spent = defaultdict(Decimal)
+        per_user = defaultdict(int)
+        rollups = RollupBatch()
+        for (template, plan, day), key in zip(due, keys):
+            if key in existing:
+                continue
+            records.append({
+                "user_id": template.user_id,
+                "plan_id": plan.plan_id,
+                "category_id": plan.category_id,
+                "amount": template.amount,
+                "description": template.description,
+                "expense_date": datetime.combine(day, datetime.min.time()),
+                "recurrence_key": key
+            })
+            spent[plan.plan_id] += template.amount
+            rollups.add(template.user_id, plan.plan_id, plan.category_id, day, template.amount)
+            per_user[template.user_id] += 1
+
+        if records:
+            db.session.execute(insert(Expense), records)
+            rollups.apply()
+            for plan_id, total in spent.items():
+                adjust_plan_spent(plan_id, total)
+        for user_id, count in per_user.items():
+            created[user_id] += count
+            emit(user_id, "expenses.created", count=count, source="recurring")
+        db.session.commit()
+    return created
+
+
+def run_due(today=None, batch_size=None):
+    """Roll over ended plans, then materialize recurring expenses, as of
+    `today` (defaults to the real date; pass another one to time-travel).
+    Safe to run on several nodes at once and to rerun for the same day."""
+    today = today or date.today()
+    batch_size = batch_size or current_app.config["SCHEDULER_BATCH_SIZE"]
+
+    # Pace alerts raised by this run are projected as of the same day
+    db.session.info[AS_OF_KEY] = today
+    try:
+        plans = roll_over_plans(today, batch_size)
+        expenses = materialize_recurring(today, batch_size)
+    finally:
+        db.session.info.pop(AS_OF_KEY, None)
+
+    for user_id in set(plans) | set(expenses):
+        bump_versions(user_id, ("plans", "expenses"))
+
+    result = {"plans_rolled": sum(plans.values()), "expenses_created": sum(expenses.values())}
+    logger.info("scheduler run", extra={"date": today.isoformat(), **result})
+    return result
+
+
+class BackgroundScheduler:
+    """Calls `run_due` every `interval` seconds from a thread of the web process.
+
+    Version bumps and events then go through the same cache backend the
+    requests use, so this also works with the in-memory backend, where a
+    separate `flask scheduler run` process would bump versions nobody sees.
+    With several nodes each one runs it; `run_due` is safe for that.
+    """
+
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    run_due()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("scheduler run failed")
+            self._stop.wait(self.interval)
+
+
+def init_scheduler(app):
+    interval = app.config["SCHEDULER_INTERVAL"]
+    if not interval:
+        return
+    scheduler = app.extensions["scheduler"] = BackgroundScheduler(app, interval)
+
+    @app.before_request
+    def start_scheduler():
+        # Started lazily so importing the app or running CLI commands spawns no thread
+        if scheduler._thread is None:
+            scheduler.start()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, constr, condecimal, validator
+from pydantic import BaseModel, EmailStr, constr, condecimal, conint, validator
 from typing import Optional
 from datetime import date
 
@@ -11,11 +11,15 @@ class LoginSchema(BaseModel):
     email: EmailStr
     password: constr(min_length=1)
 
+class RefreshSchema(BaseModel):
+    refresh_token: constr(min_length=1)
+
 class CreatePlanSchema(BaseModel):
     category_id: int
     amount: float  # ← Receives JavaScript numbers properly
     start_date: date
     end_date: date
+    auto_rollover: bool = False
 
     @validator("amount")
     def validate_amount(cls, v):
@@ -65,9 +69,65 @@ class UpdateBudgetPlanSchema(BaseModel):
             raise ValueError("end_date must be >= start_date")
         return v
 
+class RecurringExpenseSchema(BaseModel):
+    plan_id: int
+    amount: condecimal(gt=0)
+    description: constr(min_length=1, max_length=255)
+    frequency: constr(regex=r"^(daily|weekly|monthly)$")
+    interval: conint(ge=1, le=365) = 1
+    start_date: date
+    end_date: Optional[date] = None
+
+    @validator("end_date")
+    def end_after_start(cls, v, values):
+        if v and "start_date" in values and v < values["start_date"]:
+            raise ValueError("end_date must be on or after start_date")
+        return v
+
 class UpdateExpenseSchema(BaseModel):
     plan_id: int
     category_id: int
     amount: condecimal(gt=0)
     description: constr(min_length=1, max_length=255)  # Changed to required
-    expense_date: date
\ No newline at end of file
+    expense_date: date
+
+class ExpenseQuerySchema(BaseModel):
+    limit: conint(ge=1, le=500) = 100
+    cursor: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    category_id: Optional[int] = None
+    plan_id: Optional[int] = None
+    min_amount: Optional[condecimal(ge=0)] = None
+    max_amount: Optional[condecimal(ge=0)] = None
+    q: Optional[constr(min_length=1, max_length=255)] = None
+    format: constr(regex=r"^(rows|columns)$") = "rows"
+
+    @validator("end_date")
+    def end_after_start(cls, v, values):
+        if v and values.get("start_date") and v < values["start_date"]:
+            raise ValueError("end_date must be on or after start_date")
+        return v
+
+class AlertQuerySchema(BaseModel):
+    since: Optional[conint(ge=0)] = None
+    limit: conint(ge=1, le=200) = 50
+
+class AnalyticsQuerySchema(BaseModel):
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    plan_id: Optional[int] = None
+    category_id: Optional[int] = None
+    bucket: constr(regex=r"^(day|week|month)$") = "day"
+
+    @validator("end_date")
+    def end_after_start(cls, v, values):
+        if v and values.get("start_date") and v < values["start_date"]:
+            raise ValueError("end_date must be on or after start_date")
+        return v
+
+class ImportExpenseRowSchema(BaseModel):
+    plan_id: int
+    amount: condecimal(gt=0)
+    description: constr(min_length=1, max_length=255)
+    expense_date: date
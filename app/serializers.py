@@ -0,0 +1,108 @@
+from flask import jsonify, request
+from sqlalchemy import select
+from .models.budget_plan_model import BudgetPlan
+from .models.category_model import Category
+from .models.expense_model import Expense
+
+
+class Fields:
+    """Output fields of one resource, declared once.
+
+    Each field is a column (or `(column, converter)` for values JSON cannot
+    take as-is, e.g. Numeric -> float). `select()` builds a column-only
+    SELECT in field order, so rows come back as plain tuples instead of ORM
+    objects in the identity map, and `dump_all()` zips them into dicts.
+    """
+
+    def __init__(self, **fields):
+        self.fields = {
+            name: spec if isinstance(spec, tuple) else (spec, None)
+            for name, spec in fields.items()
+        }
+        self._names = tuple(self.fields)
+        self._converters = tuple(converter for _, converter in self.fields.values())
+
+    def only(self, *names):
+        return Fields(**{name: self.fields[name] for name in names})
+
+    def extend(self, **fields):
+        return Fields(**self.fields, **fields)
+
+    def exclude(self, *names):
+        return Fields(**{name: spec for name, spec in self.fields.items() if name not in names})
+
+    def select(self):
+        return select(*(column.label(name) for name, (column, _) in self.fields.items()))
+
+    def dump(self, row):
+        return {
+            name: converter(value) if converter is not None and value is not None else value
+            for name, converter, value in zip(self._names, self._converters, row)
+        }
+
+    def dump_all(self, rows):
+        dump = self.dump
+        return [dump(row) for row in rows]
+
+    def dump_columns(self, rows):
+        # {"format": "columns", "count": n, "columns": {field: [value per row]}}
+        columns = {name: [] for name in self._names}
+        targets = [columns[name] for name in self._names]
+        for row in rows:
+            for values, converter, value in zip(targets, self._converters, row):
+                values.append(converter(value) if converter is not None and value is not None else value)
+        return {"format": "columns", "count": len(rows), "columns": columns}
+
+
+def wants_columns():
+    # ?format=columns sends each field name once instead of once per row
+    return request.args.get("format") == "columns"
+
+
+def columnar(items):
+    # Columnar form of already-built dicts (all with the same keys)
+    names = list(items[0]) if items else []
+    return {
+        "format": "columns",
+        "count": len(items),
+        "columns": {name: [item[name] for item in items] for name in names}
+    }
+
+
+def list_response(fields, rows):
+    if wants_columns():
+        return jsonify(fields.dump_columns(rows))
+    return jsonify(fields.dump_all(rows))
+
+
+EXPENSE_FIELDS = Fields(
+    expense_id=Expense.expense_id,
+    plan_id=Expense.plan_id,
+    category_id=Expense.category_id,
+    category_name=Category.name,  # needs a join to categories
+    amount=(Expense.amount, float),
+    description=Expense.description,
+    expense_date=(Expense.expense_date, str)
+)
+
+PLAN_FIELDS = Fields(
+    plan_id=BudgetPlan.plan_id,
+    category_id=BudgetPlan.category_id,
+    amount=(BudgetPlan.amount, float),
+    spent=(BudgetPlan.spent, float),
+    start_date=(BudgetPlan.start_date, str),
+    end_date=(BudgetPlan.end_date, str),
+    auto_rollover=BudgetPlan.auto_rollover,
+    alert_level=BudgetPlan.alert_level,
+    pace_alert=BudgetPlan.pace_alert
+)
+
+CATEGORY_FIELDS = Fields(
+    category_id=Category.category_id,
+    name=Category.name,
+    description=Category.description
+)
+
+
+def expenses_with_category(fields=EXPENSE_FIELDS):
+    return fields.select().join(Category, Expense.category_id == Category.category_id)
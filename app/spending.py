@@ -0,0 +1,202 @@
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy.dialects import mysql, sqlite
+from .alerts import queue_evaluation
+from .database import db
+from .models.budget_plan_model import BudgetPlan
+from .models.expense_model import Expense
+from .models.spend_rollup_model import SpendRollup
+
+ROLLUP_KEY = ("user_id", "plan_id", "category_id", "day")
+
+
+def expense_day(value):
+    # expense_date may arrive as a datetime, a date or an ISO string
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def adjust_plan_spent(plan_id, delta):
+    # Server-side UPDATE ... SET spent = spent + :delta, so concurrent
+    # writers to the same plan never overwrite each other's changes
+    if not delta:
+        return
+    BudgetPlan.query.filter(BudgetPlan.plan_id == plan_id).update(
+        {BudgetPlan.spent: db.func.coalesce(BudgetPlan.spent, 0) + Decimal(delta)},
+        synchronize_session=False
+    )
+    queue_evaluation(plan_id)
+
+
+class RollupBatch:
+    """Collects spend deltas keyed by (user, plan, category, day) and applies
+    them to spend_rollups with one upsert in the current transaction."""
+
+    def __init__(self):
+        self.deltas = defaultdict(lambda: [Decimal("0"), 0])
+
+    def add(self, user_id, plan_id, category_id, expense_date, amount, count=1):
+        key = (user_id, plan_id, category_id, expense_day(expense_date))
+        delta = self.deltas[key]
+        delta[0] += Decimal(amount)
+        delta[1] += count
+
+    def remove(self, user_id, plan_id, category_id, expense_date, amount):
+        self.add(user_id, plan_id, category_id, expense_date, -Decimal(amount), -1)
+
+    def apply(self):
+        rows = [
+            dict(zip(ROLLUP_KEY, key), total=total, expense_count=count)
+            for key, (total, count) in self.deltas.items()
+            if total or count
+        ]
+        if not rows:
+            return
+        db.session.execute(upsert_rollups(rows))
+
+        # Drop buckets whose last expense was removed
+        emptied = [key for key, (_, count) in self.deltas.items() if count < 0]
+        for user_id, plan_id, category_id, day in emptied:
+            SpendRollup.query.filter(
+                SpendRollup.user_id == user_id,
+                SpendRollup.plan_id == plan_id,
+                SpendRollup.category_id == category_id,
+                SpendRollup.day == day,
+                SpendRollup.expense_count <= 0
+            ).delete(synchronize_session=False)
+        self.deltas.clear()
+
+
+def upsert_rollups(rows):
+    # INSERT ... ON DUPLICATE KEY / ON CONFLICT adding the deltas to existing buckets
+    dialect = db.session.get_bind().dialect.name
+    table = SpendRollup.__table__
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update(
+            total=table.c.total + stmt.inserted.total,
+            expense_count=table.c.expense_count + stmt.inserted.expense_count
+        )
+    stmt = sqlite.insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={
+            "total": table.c.total + stmt.excluded.total,
+            "expense_count": table.c.expense_count + stmt.excluded.expense_count
+        }
+    )
+
+
+def record_expense(expense):
+    batch = RollupBatch()
+    batch.add(expense.user_id, expense.plan_id, expense.category_id, expense.expense_date, expense.amount)
+    batch.apply()
+
+
+def forget_expense(expense):
+    batch = RollupBatch()
+    batch.remove(expense.user_id, expense.plan_id, expense.category_id, expense.expense_date, expense.amount)
+    batch.apply()
+
+
+def expected_rollups(user_id=None):
+    # Recompute the rollups straight from the expenses table
+    day = db.func.date(Expense.expense_date)
+    query = db.session.query(
+        Expense.user_id,
+        Expense.plan_id,
+        Expense.category_id,
+        day,
+        db.func.sum(Expense.amount),
+        db.func.count(Expense.expense_id)
+    )
+    if user_id is not None:
+        query = query.filter(Expense.user_id == user_id)
+    rows = query.group_by(Expense.user_id, Expense.plan_id, Expense.category_id, day).all()
+    return {
+        (u, p, c, expense_day(d)): (Decimal(total), count)
+        for u, p, c, d, total, count in rows
+    }
+
+
+def verify_rollups(user_id=None):
+    """Compare spend_rollups with the expenses table.
+    Returns a list of drifted buckets (empty when everything matches)."""
+    expected = expected_rollups(user_id)
+
+    query = db.session.query(
+        SpendRollup.user_id,
+        SpendRollup.plan_id,
+        SpendRollup.category_id,
+        SpendRollup.day,
+        SpendRollup.total,
+        SpendRollup.expense_count
+    )
+    if user_id is not None:
+        query = query.filter(SpendRollup.user_id == user_id)
+    actual = {(u, p, c, d): (Decimal(total), count) for u, p, c, d, total, count in query.all()}
+
+    drift = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        want = expected.get(key, (Decimal("0"), 0))
+        have = actual.get(key, (Decimal("0"), 0))
+        if want != have:
+            drift.append({
+                **dict(zip(ROLLUP_KEY, key)),
+                "expected_total": want[0],
+                "actual_total": have[0],
+                "expected_count": want[1],
+                "actual_count": have[1]
+            })
+    return drift
+
+
+def verify_plan_spent(user_id=None):
+    """Compare BudgetPlan.spent with SUM(expenses.amount) for each plan.
+    Returns a list of plans whose denormalized total has drifted."""
+    totals = db.session.query(Expense.plan_id, db.func.sum(Expense.amount).label("total")).\
+        group_by(Expense.plan_id).\
+        subquery()
+    query = db.session.query(BudgetPlan.user_id, BudgetPlan.plan_id, BudgetPlan.spent, totals.c.total).\
+        outerjoin(totals, totals.c.plan_id == BudgetPlan.plan_id)
+    if user_id is not None:
+        query = query.filter(BudgetPlan.user_id == user_id)
+
+    drift = []
+    for user, plan_id, spent, total in query.all():
+        spent = Decimal(spent or 0)
+        total = Decimal(total or 0)
+        if spent != total:
+            drift.append({"user_id": user, "plan_id": plan_id, "spent": spent, "expected_spent": total})
+    return drift
+
+
+def rebuild_plan_spent(user_id=None):
+    # Reset BudgetPlan.spent to SUM(expenses.amount) in a single UPDATE
+    total = db.session.query(db.func.coalesce(db.func.sum(Expense.amount), 0)).\
+        filter(Expense.plan_id == BudgetPlan.plan_id).\
+        scalar_subquery()
+    query = BudgetPlan.query
+    if user_id is not None:
+        query = query.filter(BudgetPlan.user_id == user_id)
+    return query.update({BudgetPlan.spent: total}, synchronize_session=False)
+
+
+def rebuild_rollups(user_id=None):
+    # Replace spend_rollups with a fresh aggregate of the expenses table
+    query = SpendRollup.query
+    if user_id is not None:
+        query = query.filter(SpendRollup.user_id == user_id)
+    query.delete(synchronize_session=False)
+
+    rows = [
+        dict(zip(ROLLUP_KEY, key), total=total, expense_count=count)
+        for key, (total, count) in expected_rollups(user_id).items()
+    ]
+    if rows:
+        db.session.execute(SpendRollup.__table__.insert(), rows)
+    return len(rows)
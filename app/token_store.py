@@ -0,0 +1,15 @@
+import time
+
+
+class TokenStore:
+    """Revoked token ids (jti) kept in a cache backend until the token expires.
+    With a shared backend (Redis) a token revoked on one node is revoked on all."""
+
+    def __init__(self, cache, prefix="revoked:"):
+        self.cache = cache
+        self.prefix = prefix
+
+    def revoke(self, jti, expires_at):
+        # Returns True if this call revoked the token, False if it already was
+        ttl = max(1, int(expires_at - time.time()) + 1)
+        return self.cache.add(self.prefix + jti, "1", ttl=ttl)
@@ -1,3 +1,5 @@
+import base64
+import json
 from functools import wraps
 from flask import request, jsonify
 from pydantic import ValidationError
@@ -22,6 +24,36 @@ def validate_json(schema):
         return wrapper
     return decorator
 
+def validate_args(schema):
+    # Same as validate_json, but for query string parameters
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                validated = schema(**request.args.to_dict())
+            except ValidationError as e:
+                return jsonify({"error": "validation_error", "details": e.errors()}), 400
+
+            return fn(validated, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def encode_cursor(*values):
+    # Opaque, URL-safe keyset cursor for the last row of a page
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    # Returns the list of string values, or None if the cursor is malformed
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list):
+        return None
+    return values
+
 from functools import wraps
 from .database import db
 
@@ -0,0 +1,94 @@
+import time
+from functools import wraps
+from flask import current_app, g, make_response, request
+from .cache import cache_backend, invalidate
+from .response_cache import invalidation_key, response_cache
+
+# Per-user collections whose version counters back the list endpoints' ETags
+COLLECTIONS = ("plans", "categories", "expenses", "profile")
+
+
+def _version_key(user_id, collection):
+    return f"ver:{user_id}:{collection}"
+
+
+def mark_changed(*collections):
+    """Record that this request modifies the current user's collections.
+    Their versions are bumped after the response, only if it succeeded."""
+    g.setdefault("changed_collections", set()).update(collections)
+
+
+def collection_versions(user_id, collections):
+    cache = cache_backend()
+    versions = []
+    for collection in collections:
+        key = _version_key(user_id, collection)
+        version = cache.get(key)
+        if version is None:
+            # Seed unknown/evicted counters from the clock so a reset counter
+            # can never reproduce an ETag a client saw before
+            cache.add(key, time.time_ns())
+            version = cache.get(key)
+        versions.append(str(version))
+    return versions
+
+
+def bump_versions(user_id, collections):
+    cache = cache_backend()
+    for collection in collections:
+        key = _version_key(user_id, collection)
+        if not cache.add(key, time.time_ns()):
+            cache.incr(key)
+    # Free cached responses built on the old versions, in every process
+    invalidate(*(invalidation_key(user_id, collection) for collection in collections))
+
+
+def conditional(*collections, cache=False):
+    """Weak ETag from the user's collection versions. A matching If-None-Match
+    gets a 304 before the handler (and its queries) runs.
+
+    With `cache=True` the serialized 200 body is also kept in the response
+    cache, so a client without the ETag skips the queries and serialization too.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            user_id = g.current_user["user_id"]
+            etag = "-".join([str(user_id)] + collection_versions(user_id, collections))
+            if request.if_none_match.contains_weak(etag):
+                response = make_response("", 304)
+            else:
+                cached = response_cache().get(user_id, request.full_path, etag) if cache else None
+                if cached is not None:
+                    body, mimetype = cached
+                    response = current_app.response_class(body, mimetype=mimetype)
+                else:
+                    response = make_response(fn(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    # A replica may lag the versions: a body read there gets no
+                    # ETag and is not cached, or a later If-None-Match would keep
+                    # confirming stale data. Primary-built ETags and cached bodies
+                    # stay valid however this request was routed.
+                    if g.get("replica_bind") is not None:
+                        response.headers["Cache-Control"] = "private, no-cache"
+                        return response
+                    if cache:
+                        response_cache().put(user_id, request.full_path, etag, collections,
+                                             response.get_data(), response.mimetype)
+            response.set_etag(etag, weak=True)
+            # Let clients store the body but revalidate it on every use
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return wrapper
+    return decorator
+
+
+def init_versions(app):
+    @app.after_request
+    def bump_changed_collections(response):
+        changed = g.get("changed_collections")
+        user = g.get("current_user")
+        if changed and user and response.status_code < 400:
+            bump_versions(user["user_id"], changed)
+        return response
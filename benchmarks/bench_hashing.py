@@ -0,0 +1,155 @@
+"""Login burst: login throughput against the latency of other endpoints.
+
+    python -m benchmarks.bench_hashing [--method scrypt] [--logins 64] [--threads 16]
+
+For each hashing configuration (inline, then process pools of 2 and 4),
+`--threads` client threads POST `--logins` logins to /api/auth/login
+through the test client, while one more thread keeps requesting
+GET /api/budget_plans/budget_plans (auth, ETag and a real query, response
+cache off). The table shows login throughput and latency, and the p50/p99
+of that plan list during the burst, which is how much hashing slows down
+everything else in the process. 503s are logins the pool refused with
+HashingBusy (answered with Retry-After).
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("JWT_SECRET", "bench-jwt-secret-" + "x" * 32)
+
+from app import create_app, db  # noqa: E402
+from app.auth import auth_settings  # noqa: E402
+
+PASSWORD = "secret123"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def setup(app):
+    # One user with a few plans; returns auth headers for the plan list
+    client = app.test_client()
+    response = client.post("/api/auth/register", json={
+        "username": "bench", "email": "bench@example.com", "password": PASSWORD
+    })
+    if response.status_code == 409:
+        response = client.post("/api/auth/login", json={"email": "bench@example.com", "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {response.json['access_token']}"}
+    if not client.get("/api/budget_plans/budget_plans", headers=headers).json:
+        for i in range(20):
+            category_id = client.post("/api/categories/categories", json={"name": f"cat {i}"},
+                                      headers=headers).json["category_id"]
+            client.post("/api/budget_plans/budget_plans", json={
+                "category_id": category_id, "amount": 100 + i, "start_date": "2026-01-01", "end_date": "2026-12-31"
+            }, headers=headers)
+    return headers
+
+
+def probe(app, headers, stop, samples):
+    client = app.test_client()
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = client.get("/api/budget_plans/budget_plans", headers=headers)
+        assert response.status_code == 200, response.status_code
+        samples.append(time.perf_counter() - started)
+
+
+def run(app, headers, logins, threads):
+    latencies, rejected = [], 0
+    lock = threading.Lock()
+
+    def login(_):
+        nonlocal rejected
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post("/api/auth/login", json={"email": "bench@example.com", "password": PASSWORD})
+        elapsed = time.perf_counter() - started
+        with lock:
+            if response.status_code == 503:
+                rejected += 1
+            else:
+                assert response.status_code == 200, response.status_code
+                latencies.append(elapsed)
+
+    login(None)  # start pool processes outside the timing
+    latencies.clear()
+
+    # The plan list alone, as a baseline for the burst numbers
+    stop, idle = threading.Event(), []
+    prober = threading.Thread(target=probe, args=(app, headers, stop, idle))
+    prober.start()
+    time.sleep(1)
+    stop.set()
+    prober.join()
+
+    stop, probes = threading.Event(), []
+    prober = threading.Thread(target=probe, args=(app, headers, stop, probes))
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    return {
+        "ok": len(latencies),
+        "rejected": rejected,
+        "per_sec": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "idle_p99_ms": percentile(idle, 99) * 1000,
+        "plans_p50_ms": statistics.median(probes) * 1000 if probes else 0.0,
+        "plans_p99_ms": percentile(probes, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--method", default="scrypt")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--max-pending", type=int, default=16)
+    args = parser.parse_args()
+
+    configs = [("inline", 0, args.logins), ("pool x2", 2, args.max_pending), ("pool x4", 4, args.max_pending)]
+    print(f"{args.logins} logins over {args.threads} threads, method {args.method}")
+    print(f"{'config':<10} {'ok':>5} {'503':>5} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'plans idle p99':>15} {'plans p50':>10} {'plans p99':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, workers, max_pending in configs:
+            app = create_app({
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                "PASSWORD_HASH_METHOD": args.method,
+                "HASH_WORKERS": workers,
+                "HASH_MAX_PENDING": max_pending,
+                "HASH_TIMEOUT": 60,
+                "RESPONSE_CACHE_SIZE": 0,
+                "LOG_LEVEL": "WARNING",
+                "QUOTE_GENERATOR": lambda: None,
+            })
+            with app.app_context():
+                db.create_all()
+            headers = setup(app)
+            try:
+                r = run(app, headers, args.logins, args.threads)
+            finally:
+                with app.app_context():
+                    auth_settings().hasher.shutdown()
+                    for engine in db.engines.values():
+                        engine.dispose()
+            print(f"{name:<10} {r['ok']:>5} {r['rejected']:>5} {r['per_sec']:>9.1f} {r['p50_ms']:>8.1f} "
+                  f"{r['p99_ms']:>8.1f} {r['idle_p99_ms']:>15.1f} {r['plans_p50_ms']:>10.1f} "
+                  f"{r['plans_p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""List endpoints at 10k rows: hand-built dicts + jsonify vs the serializer layer.
+
+    python -m benchmarks.bench_list_endpoints [--rows 10000] [--repeat 20]
+
+Seeds one user with `--rows` expenses in a throwaway SQLite file, then
+times two things:
+
+* serialization only, inside an app context: the old ORM objects +
+  field-by-field dicts + stdlib json, against `Fields` column-only selects
+  dumped by the stdlib and the orjson providers, as rows and as columns;
+* full requests through the test client (auth, ETag, routing included) to
+  the by-plan expense list, `/api/expenses/expenses?limit=500` and the
+  dashboard, with the response cache off and then on.
+
+orjson rows are skipped when orjson is not installed.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("JWT_SECRET", "bench-jwt-secret-" + "x" * 32)
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.json_provider import OrjsonProvider, orjson  # noqa: E402
+from app.models.category_model import Category  # noqa: E402
+from app.models.expense_model import Expense  # noqa: E402
+from app.serializers import EXPENSE_FIELDS, expenses_with_category  # noqa: E402
+
+
+def timed(fn, repeat):
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def seed(app, rows):
+    client = app.test_client()
+    response = client.post("/api/auth/register", json={
+        "username": "bench", "email": "bench@example.com", "password": "secret123"
+    })
+    headers = {"Authorization": f"Bearer {response.json['access_token']}"}
+    category_id = client.post("/api/categories/categories", json={"name": "Food"}, headers=headers).json["category_id"]
+    plan_id = client.post("/api/budget_plans/budget_plans", json={
+        "category_id": category_id, "amount": 10 ** 9, "start_date": "2020-01-01", "end_date": "2030-12-31"
+    }, headers=headers).json["plan_id"]
+
+    with app.app_context():
+        user_id = db.session.get(Category, category_id).user_id
+        start = datetime(2024, 1, 1)
+        db.session.execute(insert(Expense), [{
+            "user_id": user_id,
+            "plan_id": plan_id,
+            "category_id": category_id,
+            "amount": Decimal(f"{i % 500}.{i % 100:02d}"),
+            "description": f"expense {i}",
+            "expense_date": start + timedelta(minutes=i)
+        } for i in range(rows)])
+        db.session.commit()
+    return client, headers, user_id, plan_id
+
+
+def legacy_dicts(user_id):
+    # What the handlers did before: ORM objects, then dicts field by field
+    rows = db.session.query(Expense, Category.name).\
+        join(Category, Expense.category_id == Category.category_id).\
+        filter(Expense.user_id == user_id).all()
+    return [{
+        "expense_id": expense.expense_id,
+        "plan_id": expense.plan_id,
+        "category_id": expense.category_id,
+        "category_name": name,
+        "amount": float(expense.amount),
+        "description": expense.description,
+        "expense_date": str(expense.expense_date)
+    } for expense, name in rows]
+
+
+def serialization(app, user_id, repeat):
+    providers = [("stdlib", DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider(app)))
+
+    def fields_rows():
+        return db.session.execute(expenses_with_category().where(Expense.user_id == user_id)).all()
+
+    results = []
+    with app.app_context():
+        def legacy():
+            json.dumps(legacy_dicts(user_id))
+            db.session.expunge_all()
+        results.append(("ORM dicts + json.dumps", timed(legacy, repeat)))
+        for name, provider in providers:
+            results.append((f"Fields rows + {name}",
+                            timed(lambda: provider.dumps(EXPENSE_FIELDS.dump_all(fields_rows())), repeat)))
+            results.append((f"Fields columns + {name}",
+                            timed(lambda: provider.dumps(EXPENSE_FIELDS.dump_columns(fields_rows())), repeat)))
+    return results
+
+
+def requests(app, client, headers, plan_id, repeat):
+    paths = [
+        ("by plan", f"/api/expenses/expenses/{plan_id}"),
+        ("by plan, columns", f"/api/expenses/expenses/{plan_id}?format=columns"),
+        ("list, limit=500", "/api/expenses/expenses?limit=500"),
+        ("dashboard, recent=500", "/api/dashboard?recent=500"),
+    ]
+    results = []
+    for path_name, path in paths:
+        def get():
+            response = client.get(path, headers=headers)
+            assert response.status_code == 200, response.status_code
+            return response
+        size = len(get().get_data())
+        results.append((path_name, size, timed(get, repeat)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "HASH_WORKERS": 0,
+            "LOG_LEVEL": "WARNING",
+            "QUOTE_GENERATOR": lambda: None,
+            "RESPONSE_CACHE_SIZE": 0,
+        }
+        app = create_app(base)
+        with app.app_context():
+            db.create_all()
+        client, headers, user_id, plan_id = seed(app, args.rows)
+
+        print(f"{args.rows} expenses, median of {args.repeat} runs")
+        print(f"\n{'serialization':<28} {'ms':>8} {'speedup':>8}")
+        results = serialization(app, user_id, args.repeat)
+        baseline = results[0][1]
+        for name, ms in results:
+            print(f"{name:<28} {ms:>8.1f} {baseline / ms:>7.1f}x")
+
+        # Same data behind different providers / cache settings; each app is
+        # a separate process in production, here they just share the file
+        setups = [("stdlib, no cache", base, DefaultJSONProvider)]
+        if orjson is not None:
+            setups.append(("orjson, no cache", base, None))
+        setups.append(("default, response cache", {**base, "RESPONSE_CACHE_SIZE": 1000}, None))
+        for setup_name, config, provider in setups:
+            setup_app = create_app(config)
+            if provider is not None:
+                setup_app.json = provider(setup_app)
+            print(f"\n{'GET (' + setup_name + ')':<40} {'KiB':>8} {'ms':>8}")
+            for path_name, size, ms in requests(setup_app, setup_app.test_client(), headers, plan_id, args.repeat):
+                print(f"{path_name:<40} {size / 1024:>8.0f} {ms:>8.1f}")
+            with setup_app.app_context():
+                for engine in db.engines.values():
+                    engine.dispose()
+
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
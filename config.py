@@ -7,7 +7,66 @@ class Config:
     JWT_SECRET = os.environ.get("JWT_SECRET")
     JWT_ALGORITHM = "HS256"
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)  # 1 hour default
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get("JWT_REFRESH_TOKEN_DAYS", 14)))
+    # Shared state (token revocations, quote pool, response caches): "memory://" for a
+    # single process, or redis://host:6379/0 so several app nodes can sit behind a load balancer
+    CACHE_URL = os.environ.get("CACHE_URL", "memory://")
+    TOKEN_STORE_URL = os.environ.get("TOKEN_STORE_URL")  # optional separate store for revoked tokens
+    # werkzeug method string; the default matches werkzeug's own ("scrypt" = scrypt:32768:8:1),
+    # so existing hashes stay as they are. Set e.g. "pbkdf2:sha256:600000" to opt in to another
+    # KDF: stored hashes made with other parameters are upgraded on the next login
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+    HASH_WORKERS = int(os.environ.get("HASH_WORKERS", 2))  # 0 hashes inline on the request thread
+    HASH_MAX_PENDING = int(os.environ.get("HASH_MAX_PENDING", 16))  # queued + running jobs before 503
+    HASH_TIMEOUT = float(os.environ.get("HASH_TIMEOUT", 10))  # seconds
+    TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", 10000))  # 0 disables the verified-token cache
+    TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", 300))  # seconds
     SQLALCHEMY_DATABASE_URI = os.environ.get("SQLALCHEMY_DATABASE_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool (SQLALCHEMY_ENGINE_OPTIONS is built from these; in-memory SQLite ignores them).
+    # Keep DB_POOL_RECYCLE below MySQL's wait_timeout so idle connections are replaced, not reused dead
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 5))  # seconds to wait for a connection before 503
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))  # seconds
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Comma-separated read replica URIs; GET list endpoints read from them
+    DB_REPLICA_URIS = [uri.strip() for uri in os.environ.get("DB_REPLICA_URIS", "").split(",") if uri.strip()]
+    # Seconds a client keeps reading from the primary after its own write (covers replication lag)
+    DB_READ_AFTER_WRITE_WINDOW = float(os.environ.get("DB_READ_AFTER_WRITE_WINDOW", 5))
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")  # "json" or "text"
+    METRICS_SERVER_TIMING = os.environ.get("METRICS_SERVER_TIMING", "false").lower() == "true"
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # bearer token for /metrics*; unset = endpoints disabled
+    QUERY_REPEAT_WARN = os.environ.get("QUERY_REPEAT_WARN", "false").lower() == "true"  # always on in debug
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get("QUERY_REPEAT_THRESHOLD", 5))  # same statement N+ times per request
+    LOG_ACCESS_SAMPLE_RATE = float(os.environ.get("LOG_ACCESS_SAMPLE_RATE", 0.1))  # share of successful requests logged
+    RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 1000))  # cached GET bodies per process; 0 disables
+    RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 60))  # seconds
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "true").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))  # bytes; smaller bodies go out as-is
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get("COMPRESS_BROTLI_QUALITY", 5))  # used when brotli is installed
+    DASHBOARD_RECENT_EXPENSES = int(os.environ.get("DASHBOARD_RECENT_EXPENSES", 50))
+    IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", 1000))
+    IMPORT_MAX_ERRORS = int(os.environ.get("IMPORT_MAX_ERRORS", 1000))
+    SSE_HEARTBEAT = int(os.environ.get("SSE_HEARTBEAT", 15))  # seconds between keep-alive comments on idle streams
+    SSE_MAX_DURATION = int(os.environ.get("SSE_MAX_DURATION", 300))  # seconds before a stream ends and the client reconnects
+    SSE_QUEUE_SIZE = int(os.environ.get("SSE_QUEUE_SIZE", 100))  # undelivered events per stream before it must resync
+    ALERT_THRESHOLDS = [int(t) for t in os.environ.get("ALERT_THRESHOLDS", "50,80,100").split(",")]  # percent of plan amount
+    ALERT_PACE_MIN_DAYS = int(os.environ.get("ALERT_PACE_MIN_DAYS", 3))  # days into a plan before pace is projected
+    ALERT_FEED_SETTLE = float(os.environ.get("ALERT_FEED_SETTLE", 5))  # seconds before the feed cursor passes an alert
+    SCHEDULER_BATCH_SIZE = int(os.environ.get("SCHEDULER_BATCH_SIZE", 500))  # due rows locked and processed per batch
+    # Seconds between scheduler runs inside each web process; 0 leaves it to `flask scheduler run`
+    SCHEDULER_INTERVAL = int(os.environ.get("SCHEDULER_INTERVAL", 0))
+    EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+    QUOTE_GENERATOR = None  # callable returning (quote, model) or None; defaults to Gemini
+    QUOTE_POOL_SIZE = int(os.environ.get("QUOTE_POOL_SIZE", 20))
+    QUOTE_POOL_REFILL_BELOW = int(os.environ.get("QUOTE_POOL_REFILL_BELOW", 5))
+    QUOTE_RETRY_INTERVAL = int(os.environ.get("QUOTE_RETRY_INTERVAL", 30))  # seconds between refill attempts
+    GEMINI_TIMEOUT = float(os.environ.get("GEMINI_TIMEOUT", 5))  # overall budget per quote, in seconds
+    GEMINI_HEDGE_DELAY = float(os.environ.get("GEMINI_HEDGE_DELAY", 0.5))  # 0 = query all models at once
+    GEMINI_BREAKER_THRESHOLD = int(os.environ.get("GEMINI_BREAKER_THRESHOLD", 3))  # failures before a model is skipped
+    GEMINI_BREAKER_RESET = float(os.environ.get("GEMINI_BREAKER_RESET", 30))  # seconds before a half-open probe
 
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
@@ -84,6 +84,8 @@ const API = "/api";
 
 /* AUTH TOKEN */
 let authToken = localStorage.getItem("authToken") || null;
+let refreshToken = localStorage.getItem("refreshToken") || null;
+let refreshPromise = null;
 
 /* --------------------------
    GLOBAL DATA MANAGEMENT WITH SYNCHRONIZATION
@@ -93,6 +95,8 @@ let userData = {
     categories: [],
     budgetPlans: [],
     expenses: [],
+    expenseCount: 0,
+    expensesCursor: null,
     isLoading: false,
     loadPromise: null
 };
@@ -373,6 +377,89 @@ function getAuthHeaders() {
     };
 }
 
+function saveTokens(data) {
+    authToken = data.access_token;
+    localStorage.setItem("authToken", data.access_token);
+    if (data.refresh_token) {
+        refreshToken = data.refresh_token;
+        localStorage.setItem("refreshToken", data.refresh_token);
+    }
+}
+
+// Tabs share localStorage: another tab may have rotated the token pair since
+// this one read it. Returns true when the stored tokens differ from ours.
+function syncStoredTokens() {
+    const storedAccess = localStorage.getItem("authToken");
+    const storedRefresh = localStorage.getItem("refreshToken");
+    const changed = storedAccess !== authToken || storedRefresh !== refreshToken;
+    authToken = storedAccess;
+    refreshToken = storedRefresh;
+    return changed;
+}
+
+const REFRESH_RACE_DELAY = 500;
+
+// Swap the refresh token for a new token pair; concurrent callers share one request
+async function refreshAccessToken() {
+    // Another tab already refreshed: retry with its tokens instead of
+    // replaying our refresh token, which that rotation revoked
+    if (syncStoredTokens() && authToken) {
+        return true;
+    }
+    if (!refreshToken) {
+        return false;
+    }
+    if (!refreshPromise) {
+        const usedToken = refreshToken;
+        refreshPromise = fetch(`${API}/auth/refresh`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ refresh_token: usedToken })
+        }).then(async (res) => {
+            if (res.ok) {
+                saveTokens(await res.json());
+                return true;
+            }
+            // Lost a race with another tab refreshing the same token: its new
+            // pair lands in localStorage moments later
+            await new Promise(resolve => setTimeout(resolve, REFRESH_RACE_DELAY));
+            syncStoredTokens();
+            return !!authToken && refreshToken !== usedToken;
+        }).catch(() => false).finally(() => {
+            refreshPromise = null;
+        });
+    }
+    return refreshPromise;
+}
+
+// GET bodies kept with their ETag, so unchanged lists come back as cheap 304s
+const responseCache = new Map();
+const RESPONSE_CACHE_LIMIT = 50;
+
+function requestInit(options, etag) {
+    const init = { headers: getAuthHeaders(), ...options };
+    if (etag) {
+        init.headers = { ...init.headers, "If-None-Match": etag };
+    }
+    return init;
+}
+
+async function rememberResponse(url, response) {
+    const etag = response.headers.get("ETag");
+    if (!response.ok || !etag) {
+        return;
+    }
+    responseCache.delete(url);
+    responseCache.set(url, {
+        etag,
+        body: await response.clone().text(),
+        headers: Object.fromEntries(response.headers.entries())
+    });
+    if (responseCache.size > RESPONSE_CACHE_LIMIT) {
+        responseCache.delete(responseCache.keys().next().value);
+    }
+}
+
 async function apiCall(url, options = {}) {
     try {
         if (!authToken) {
@@ -381,15 +468,28 @@ async function apiCall(url, options = {}) {
             return null;
         }
 
-        const response = await fetch(url, {
-            headers: getAuthHeaders(),
-            ...options
-        });
+        const isGet = !options.method || options.method.toUpperCase() === "GET";
+        const cached = isGet ? responseCache.get(url) : null;
+
+        let response = await fetch(url, requestInit(options, cached && cached.etag));
+
+        // Access token expired: refresh once and retry instead of forcing a new login
+        if (response.status === 401 && await refreshAccessToken()) {
+            response = await fetch(url, requestInit(options, cached && cached.etag));
+        }
         
         if (response.status === 401) {
             logout();
             return null;
         }
+
+        if (isGet) {
+            // Not modified: hand callers the stored body as a normal 200
+            if (response.status === 304 && cached) {
+                return new Response(cached.body, { status: 200, headers: cached.headers });
+            }
+            await rememberResponse(url, response);
+        }
         
         return response;
     } catch (error) {
@@ -401,17 +501,33 @@ async function apiCall(url, options = {}) {
 
 /* --------------------------logout FUNCTIONALITY --------------------------- */
 function logout() {
+    // Revoke the refresh token on the server (fire and forget)
+    if (refreshToken) {
+        fetch(`${API}/auth/logout`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ refresh_token: refreshToken })
+        }).catch(() => {});
+    }
+
     // Clear local storage
     localStorage.removeItem("authToken");
+    localStorage.removeItem("refreshToken");
     localStorage.removeItem('theme'); // Optional: keep theme preference
+    responseCache.clear();
+    stopAlertPolling();
+    stopLiveUpdates();
     
     // Reset global variables
     authToken = null;
+    refreshToken = null;
     userData = { 
         profile: null, 
         categories: [], 
         budgetPlans: [], 
         expenses: [],
+        expenseCount: 0,
+        expensesCursor: null,
         isLoading: false,
         loadPromise: null
     };
@@ -455,16 +571,15 @@ async function loadAllUserData() {
     try {
         console.log("Loading all user data...");
         
-        // Load in sequence to ensure dependencies
-        await loadUserProfile();
-        await loadCategories();
-        await loadBudgetPlans();
-        await loadExpenses();
+        // One request for profile, categories, plans and recent expenses
+        await loadDashboard();
         
         console.log("All user data loaded successfully");
         await loadQuote();
         updateAllDisplays();
         updateExpensePlanDropdown(); // ← NEED TO ADD THIS!
+        startAlertPolling();
+        startLiveUpdates();
     } catch (error) {
         console.error('Failed to load user data:', error);
         throw error;
@@ -473,6 +588,179 @@ async function loadAllUserData() {
     }
 }
 
+/* --------------------------
+   BUDGET ALERTS (polls the small /alerts feed instead of re-downloading plans)
+--------------------------- */
+const ALERT_POLL_INTERVAL = 60000;
+let alertCursor = null;
+let lastAlertId = 0;  // the feed re-sends recent alerts until they settle
+let alertTimer = null;
+
+function alertMessage(alert) {
+    if (alert.kind === "pace") {
+        return `At this pace you'll spend ${alert.level}% of a ${formatCurrency(alert.amount)} plan`;
+    }
+    return `You've used ${alert.level}% of a ${formatCurrency(alert.amount)} plan (${formatCurrency(alert.spent)} spent)`;
+}
+
+async function pollAlerts() {
+    try {
+        const query = alertCursor === null ? "?limit=1" : `?since=${alertCursor}`;
+        const res = await apiCall(`${API}/alerts${query}`);
+        if (!res || !res.ok) {
+            return;
+        }
+        const data = await res.json();
+        const fresh = data.alerts.filter(alert => alert.alert_id > lastAlertId);
+        // The first poll only learns the cursor; alerts from before this session are not replayed
+        if (alertCursor !== null && fresh.length > 0) {
+            const latest = fresh[fresh.length - 1];
+            showSimpleNotification(alertMessage(latest), latest.level >= 100 ? 'error' : 'warning');
+        }
+        if (data.alerts.length > 0) {
+            lastAlertId = Math.max(lastAlertId, data.alerts[data.alerts.length - 1].alert_id);
+        }
+        alertCursor = data.cursor;
+    } catch (error) {
+        console.error('Failed to poll alerts:', error);
+    }
+}
+
+// Also called after every data reload, so alerts caused by the user's own change show up right away
+function startAlertPolling() {
+    pollAlerts();
+    if (alertTimer === null) {
+        alertTimer = setInterval(pollAlerts, ALERT_POLL_INTERVAL);
+    }
+}
+
+function stopAlertPolling() {
+    clearInterval(alertTimer);
+    alertTimer = null;
+    alertCursor = null;
+    lastAlertId = 0;
+}
+
+/* --------------------------
+   LIVE UPDATES (server-sent events pushed on changes from any tab or device)
+--------------------------- */
+const LIVE_REFRESH_DELAY = 300;
+const LIVE_RECONNECT_DELAY = 5000;
+let eventSource = null;
+let liveRefreshTimer = null;
+let liveReconnectTimer = null;
+let liveConnected = false;
+
+// An expense change usually arrives together with its plan.spent event; reload once
+function scheduleLiveRefresh() {
+    clearTimeout(liveRefreshTimer);
+    liveRefreshTimer = setTimeout(async () => {
+        try {
+            await loadDashboard(); // cheap 304 when this tab already has the data
+            updateAllDisplays();
+        } catch (error) {
+            console.error('Live refresh failed:', error);
+        }
+    }, LIVE_REFRESH_DELAY);
+}
+
+function applyPlanSpent(event) {
+    const data = JSON.parse(event.data);
+    const plan = userData.budgetPlans.find(p => p.plan_id === data.plan_id);
+    if (plan) {
+        Object.assign(plan, {
+            spent: data.spent,
+            alert_level: data.alert_level,
+            pace_alert: data.pace_alert
+        });
+        updateBudgetPlanDisplay();
+    }
+}
+
+function startLiveUpdates() {
+    if (eventSource || !authToken || !window.EventSource) {
+        return;
+    }
+    // EventSource cannot send an Authorization header, so the stream takes the token in the URL
+    eventSource = new EventSource(`${API}/events/stream?access_token=${encodeURIComponent(authToken)}`);
+
+    // "ready" after a reconnect means events may have been missed while offline
+    eventSource.addEventListener("ready", () => {
+        if (liveConnected) {
+            scheduleLiveRefresh();
+        }
+        liveConnected = true;
+    });
+    for (const type of ["expense.created", "expense.updated", "expense.deleted", "expenses.created", "resync"]) {
+        eventSource.addEventListener(type, scheduleLiveRefresh);
+    }
+    eventSource.addEventListener("plan.spent", applyPlanSpent);
+    eventSource.addEventListener("alert", pollAlerts);
+
+    eventSource.onerror = () => {
+        // The browser retries dropped connections itself; it gives up on HTTP
+        // errors such as an expired token, so refresh and reconnect here
+        if (eventSource.readyState !== EventSource.CLOSED) {
+            return;
+        }
+        eventSource = null;
+        clearTimeout(liveReconnectTimer);
+        liveReconnectTimer = setTimeout(async () => {
+            if (authToken && await refreshAccessToken()) {
+                startLiveUpdates();
+            }
+        }, LIVE_RECONNECT_DELAY);
+    };
+}
+
+function stopLiveUpdates() {
+    clearTimeout(liveRefreshTimer);
+    clearTimeout(liveReconnectTimer);
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+    liveConnected = false;
+}
+
+// Rebuild row objects from a ?format=columns payload: {format, count, columns: {field: [values]}}
+function fromColumns(data) {
+    if (!data || data.format !== "columns") {
+        return data;
+    }
+    const names = Object.keys(data.columns);
+    const rows = new Array(data.count);
+    for (let i = 0; i < data.count; i++) {
+        const row = {};
+        for (const name of names) {
+            row[name] = data.columns[name][i];
+        }
+        rows[i] = row;
+    }
+    return rows;
+}
+
+async function loadDashboard() {
+    try {
+        const res = await apiCall(`${API}/dashboard?format=columns`);
+        if (res && res.ok) {
+            const data = await res.json();
+            userData.profile = data.profile;
+            userData.categories = fromColumns(data.categories);
+            userData.budgetPlans = fromColumns(data.budget_plans);
+            userData.expenses = fromColumns(data.recent_expenses);
+            userData.expenseCount = data.expense_count;
+            userData.expensesCursor = data.expenses_cursor;
+            console.log("Loaded dashboard:", userData.budgetPlans.length, "plans,", userData.expenseCount, "expenses");
+            updateProfileDisplay();
+            updateCategoryDropdowns();
+        }
+    } catch (error) {
+        console.error('Failed to load dashboard:', error);
+        throw error; // Re-throw to handle in parent function
+    }
+}
+
 async function loadUserProfile() {
     try {
         const res = await apiCall(`${API}/auth/profile`);
@@ -487,9 +775,9 @@ async function loadUserProfile() {
 
 async function loadBudgetPlans() {
     try {
-        const res = await apiCall(`${API}/budget_plans/budget_plans`);
+        const res = await apiCall(`${API}/budget_plans/budget_plans?format=columns`);
         if (res && res.ok) {
-            userData.budgetPlans = await res.json();
+            userData.budgetPlans = fromColumns(await res.json());
             console.log("Loaded budget plans:", userData.budgetPlans.length);
             updateExpensePlanDropdown(); // Ensure dropdown gets updated
         }
@@ -501,9 +789,9 @@ async function loadBudgetPlans() {
 
 async function loadCategories() {
     try {
-        const res = await apiCall(`${API}/categories/categories`);
+        const res = await apiCall(`${API}/categories/categories?format=columns`);
         if (res && res.ok) {
-            userData.categories = await res.json();
+            userData.categories = fromColumns(await res.json());
             console.log("Loaded categories:", userData.categories.length);
             updateCategoryDropdowns();
         }
@@ -513,20 +801,29 @@ async function loadCategories() {
     }
 }
 
-async function loadExpenses() {
+// The dashboard only carries the most recent expenses; page through the rest
+// with the keyset cursor from /expenses/expenses
+async function loadMoreExpenses() {
+    if (!userData.expensesCursor) {
+        return;
+    }
     try {
-        const res = await apiCall(`${API}/expenses/expenses`);
+        const cursor = encodeURIComponent(userData.expensesCursor);
+        const res = await apiCall(`${API}/expenses/expenses?format=columns&cursor=${cursor}`);
         if (res && res.ok) {
-            userData.expenses = await res.json();
-            console.log("Loaded expenses:", userData.expenses.length);
-             updateExpensePlanDropdown(); // Ensure dropdown gets updated
+            userData.expenses = userData.expenses.concat(fromColumns(await res.json()));
+            userData.expensesCursor = res.headers.get("X-Next-Cursor");
+            updateExpensesTable(userData.expenses);
         }
     } catch (error) {
-        console.error('Failed to load expenses:', error);
-        throw error; // Re-throw to handle in parent function
+        console.error('Failed to load more expenses:', error);
     }
 }
 
+const loadMoreExpensesBtn = document.getElementById('load-more-expenses');
+if (loadMoreExpensesBtn) {
+    loadMoreExpensesBtn.addEventListener('click', loadMoreExpenses);
+}
 
 /* --------------------------
    CATEGORY NAME RESOLUTION - SAFE VERSION
@@ -661,9 +958,11 @@ function updateBudgetPlanDisplay() {
         progressFill.style.width = `${Math.min(spentPercentage, 100)}%`;
         progressText.textContent = `${spentPercentage.toFixed(1)}% spent`;
         
-        if (spentPercentage > 80) {
+        // alert_level is kept by the server's alert engine (50/80/100% thresholds)
+        const alertLevel = plan.alert_level || 0;
+        if (alertLevel >= 80) {
             progressFill.style.background = 'var(--danger)';
-        } else if (spentPercentage > 60) {
+        } else if (alertLevel >= 50 || plan.pace_alert) {
             progressFill.style.background = 'var(--warning)';
         } else {
             progressFill.style.background = 'linear-gradient(90deg, var(--success), var(--primary))';
@@ -678,7 +977,7 @@ function updateBudgetPlanDisplay() {
 
 function updateQuickStats() {
     totalPlansElement.textContent = userData.budgetPlans.length;
-    totalExpensesElement.textContent = userData.expenses.length;
+    totalExpensesElement.textContent = userData.expenseCount ?? userData.expenses.length;
     totalCategoriesElement.textContent = userData.categories.length;
 }
 
@@ -764,8 +1063,7 @@ loginForm.addEventListener("submit", async (e) => {
             return;
         }
 
-        authToken = data.access_token;
-        localStorage.setItem("authToken", data.access_token);
+        saveTokens(data);
 
         showPage(app);
         showSection(homeSection);
@@ -1199,6 +1497,9 @@ expenseForm.addEventListener("submit", async (e) => {
 function updateExpensesTable(expenses) {
     const tbody = document.querySelector('#expense-table tbody');
     tbody.innerHTML = '';
+    if (loadMoreExpensesBtn) {
+        loadMoreExpensesBtn.classList.toggle('hidden', !userData.expensesCursor);
+    }
     
     if (!expenses || expenses.length === 0) {
         tbody.innerHTML = '<tr><td colspan="4" style="text-align: center; padding: 20px;">No expenses found</td></tr>';
@@ -0,0 +1,30 @@
+# Gunicorn settings, used with: gunicorn -c gunicorn.conf.py run:app
+# (needs `pip install gunicorn gevent`)
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Cooperative (gevent) workers: every open /api/events stream is a greenlet
+# parked on its queue rather than an OS thread, so thousands of idle tabs
+# cost a little memory each. PyMySQL, requests and the Redis client are pure
+# Python and become cooperative under gevent's monkey patching. Password
+# hashing runs in a process pool that is spawned rather than forked from the
+# patched worker (tests/test_gevent_smoke.py); HASH_WORKERS=0 would hash on
+# the worker itself and stall every greenlet for the length of each hash.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+# Events, revoked tokens and cache invalidations only cross process
+# boundaries through a shared CACHE_URL (Redis); with the in-memory default
+# everything has to be served by a single worker.
+if os.environ.get("CACHE_URL", "memory://").startswith("memory://"):
+    workers = 1
+else:
+    workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+# Long-lived streams are fine: gevent workers heartbeat independently of
+# requests, and streams end by themselves after SSE_MAX_DURATION
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
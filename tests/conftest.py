@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("JWT_SECRET", "test-jwt-secret-" + "x" * 32)
+
+from app import create_app, db  # noqa: E402
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build apps on a SQLite file under tmp_path. Several apps made by the
+    same test share the file, like app processes sharing one database."""
+    apps = []
+
+    def factory(**overrides):
+        config = {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "HASH_WORKERS": 0,
+            "LOG_LEVEL": "WARNING",
+            "QUOTE_GENERATOR": lambda: None,
+        }
+        config.update(overrides)
+        app = create_app(config)
+        with app.app_context():
+            # Only the primary: db.metadatas is shared by every app in the
+            # process and keeps replica bind keys from earlier apps
+            db.create_all(bind_key=None)
+        apps.append(app)
+        return app
+
+    yield factory
+
+    for app in apps:
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def register(client, name="bob"):
+    # Returns auth headers for a fresh user
+    response = client.post("/api/auth/register", json={
+        "username": name,
+        "email": f"{name}@example.com",
+        "password": "secret123"
+    })
+    assert response.status_code == 201, response.json
+    return {"Authorization": f"Bearer {response.json['access_token']}"}
+
+
+def create_plan(client, headers, amount=1000, start_date="2026-01-01", end_date="2026-12-31", **extra):
+    # Returns (category_id, plan_id)
+    response = client.post("/api/categories/categories", json={"name": f"cat-{amount}-{start_date}"}, headers=headers)
+    assert response.status_code == 201, response.json
+    category_id = response.json["category_id"]
+    response = client.post("/api/budget_plans/budget_plans", json={
+        "category_id": category_id,
+        "amount": amount,
+        "start_date": start_date,
+        "end_date": end_date,
+        **extra
+    }, headers=headers)
+    assert response.status_code == 201, response.json
+    return category_id, response.json["plan_id"]
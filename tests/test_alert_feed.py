@@ -0,0 +1,64 @@
+"""The alert feed cursor must not move past an alert_id whose transaction
+may still be committing: ids are allocated in order, commits are not."""
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.budget_alert_model import BudgetAlert
+from app.models.budget_plan_model import BudgetPlan
+
+from .conftest import create_plan, register
+
+
+def add_alert(app, plan_id, alert_id, age=0):
+    with app.app_context():
+        user_id = db.session.get(BudgetPlan, plan_id).user_id
+        db.session.add(BudgetAlert(
+            alert_id=alert_id, user_id=user_id, plan_id=plan_id, kind="threshold", level=50,
+            spent=50, amount=100, created_at=datetime.utcnow() - timedelta(seconds=age)
+        ))
+        db.session.commit()
+
+
+def poll(client, headers, since):
+    response = client.get(f"/api/alerts?since={since}", headers=headers)
+    assert response.status_code == 200
+    return response.json
+
+
+def test_late_commit_below_the_cursor_is_still_delivered(make_app):
+    app = make_app(ALERT_FEED_SETTLE=5)
+    client = app.test_client()
+    headers = register(client)
+    _, plan_id = create_plan(client, headers)
+
+    # Alert 101 is still committing when 102 becomes visible
+    add_alert(app, plan_id, 100, age=60)
+    add_alert(app, plan_id, 102)
+    feed = poll(client, headers, 0)
+    assert [a["alert_id"] for a in feed["alerts"]] == [100, 102]
+    assert feed["cursor"] == 100  # held back before the unsettled alert
+
+    add_alert(app, plan_id, 101)
+    feed = poll(client, headers, feed["cursor"])
+    assert [a["alert_id"] for a in feed["alerts"]] == [101, 102]
+    assert feed["cursor"] == 100
+    assert feed["has_more"] is False
+
+
+def test_cursor_reaches_settled_alerts(make_app):
+    app = make_app(ALERT_FEED_SETTLE=5)
+    client = app.test_client()
+    headers = register(client)
+    _, plan_id = create_plan(client, headers)
+
+    add_alert(app, plan_id, 1, age=30)
+    add_alert(app, plan_id, 2, age=10)
+    feed = poll(client, headers, 0)
+    assert feed["cursor"] == 2
+    assert poll(client, headers, 2) == {"alerts": [], "cursor": 2, "has_more": False}
+
+    # Without `since`: the latest alerts, with the cursor held back the same way
+    add_alert(app, plan_id, 3)
+    feed = client.get("/api/alerts?limit=2", headers=headers).json
+    assert [a["alert_id"] for a in feed["alerts"]] == [2, 3]
+    assert feed["cursor"] == 2
@@ -0,0 +1,26 @@
+"""Week buckets are ISO weeks on every database (the labels MySQL's %x-W%v
+gives), so dev/test on SQLite and production on MySQL agree."""
+from .conftest import create_plan, register
+
+
+def test_week_buckets_are_iso_weeks(client):
+    headers = register(client)
+    category_id, plan_id = create_plan(client, headers, start_date="2025-12-01", end_date="2027-01-31")
+    for day, amount in (("2025-12-28", "1"), ("2025-12-29", "2"), ("2026-01-04", "4"),
+                        ("2026-01-05", "8"), ("2027-01-01", "16")):
+        assert client.post("/api/expenses/expenses", json={
+            "plan_id": plan_id, "category_id": category_id, "amount": amount,
+            "description": day, "expense_date": day
+        }, headers=headers).status_code == 201
+
+    response = client.get("/api/analytics/timeseries?bucket=week", headers=headers)
+    assert response.status_code == 200
+    assert response.json["series"] == [
+        {"period": "2025-W52", "total": 1.0, "count": 1},   # Sunday
+        {"period": "2026-W01", "total": 6.0, "count": 2},   # Mon Dec 29 - Sun Jan 4
+        {"period": "2026-W02", "total": 8.0, "count": 1},
+        {"period": "2026-W53", "total": 16.0, "count": 1},  # Jan 1 2027 is a Friday
+    ]
+
+    days = client.get("/api/analytics/timeseries?bucket=day", headers=headers).json["series"]
+    assert [point["period"] for point in days][:2] == ["2025-12-28", "2025-12-29"]
@@ -0,0 +1,18 @@
+import time
+
+from app.cache import MemoryCache
+from app.token_store import TokenStore
+
+
+def test_memory_cache_sweeps_expired_keys_nobody_reads():
+    cache = MemoryCache(sweep_every=50)
+    store = TokenStore(cache)
+    for i in range(20):
+        store.revoke(f"jti-{i}", time.time())  # expires in about a second
+    time.sleep(1.1)
+
+    for i in range(50):
+        cache.set(f"live-{i}", "x")
+
+    assert not any(key.startswith("revoked:") for key in cache._values)
+    assert cache.get("live-0") == "x"
@@ -0,0 +1,26 @@
+"""Live-update streams must hold a broker subscription only while their
+body is being sent, so abandoned requests do not leak subscriptions."""
+from .conftest import register
+
+
+def test_stream_subscribes_while_open(app, client):
+    headers = register(client)
+    broker = app.extensions["events"]
+
+    stream = client.get("/api/events/stream", headers=headers, buffered=False)
+    assert b"event: ready" in next(iter(stream.response))
+    assert broker.stats() == {"users": 1, "streams": 1}
+
+    stream.close()
+    assert broker.stats() == {"users": 0, "streams": 0}
+
+
+def test_unread_streams_leave_no_subscription(app, client):
+    headers = register(client)
+    broker = app.extensions["events"]
+
+    assert client.head("/api/events/stream", headers=headers).status_code == 200
+    # Disconnected before the first chunk: the body is closed without being read
+    client.get("/api/events/stream", headers=headers, buffered=False).close()
+
+    assert broker.stats() == {"users": 0, "streams": 0}
@@ -0,0 +1,22 @@
+from app.gemini_client import CircuitBreaker
+
+
+def test_late_failures_do_not_push_back_the_probe(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.gemini_client.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is True
+    assert breaker.state == "open"
+
+    # A hedged call started before the breaker opened fails later on
+    now[0] = 120.0
+    assert breaker.record_failure() is False
+    assert breaker.opened_at == 100.0
+
+    now[0] = 130.0
+    assert breaker.allow() is True  # half-open probe, 30s after it opened
+    assert breaker.allow() is False
+    assert breaker.record_failure() is True  # the probe failed: open again from now
+    assert breaker.opened_at == 130.0
@@ -0,0 +1,62 @@
+"""Password hashing under gevent (the gunicorn.conf.py worker class): with
+the standard library monkey-patched, the spawned hashing pool must still
+serve concurrent register/login requests. Runs in a fresh interpreter,
+since patch_all() has to come before anything else is imported."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("gevent")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCRIPT = '''
+from gevent import monkey
+monkey.patch_all()
+
+import sys
+
+import gevent
+
+from app import create_app, db
+
+
+def user(app, i):
+    client = app.test_client()
+    account = {"username": f"user{i}", "email": f"user{i}@example.com", "password": "secret123"}
+    response = client.post("/api/auth/register", json=account)
+    assert response.status_code == 201, response.json
+    response = client.post("/api/auth/login", json={"email": account["email"], "password": "secret123"})
+    assert response.status_code == 200, response.json
+    return response.json["user_id"]
+
+
+if __name__ == "__main__":
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": sys.argv[1],
+        "HASH_WORKERS": 2,
+        "LOG_LEVEL": "WARNING",
+        "QUOTE_GENERATOR": lambda: None,
+    })
+    with app.app_context():
+        db.create_all()
+    jobs = [gevent.spawn(user, app, i) for i in range(4)]
+    gevent.joinall(jobs, timeout=60, raise_error=True)
+    assert sorted(job.value for job in jobs) == [1, 2, 3, 4]
+    print("ok")
+'''
+
+
+def test_register_and_login_with_hash_pool_under_gevent(tmp_path):
+    script = tmp_path / "gevent_smoke.py"
+    script.write_text(SCRIPT)
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, str(script), f"sqlite:///{tmp_path / 'smoke.db'}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-4000:]
+    assert result.stdout.strip().endswith("ok")
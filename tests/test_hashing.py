@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.auth import auth_settings
+from app.hashing import HashingBusy, PasswordHasher, method_prefix
+from app.models.user_model import User
+
+from .conftest import register
+
+
+@pytest.mark.parametrize("method", ["scrypt", "scrypt:16384:8:1", "pbkdf2", "pbkdf2:sha256:600000", "pbkdf2:sha512"])
+def test_method_prefix_matches_werkzeug(method):
+    assert method_prefix(method) == generate_password_hash("x", method).split("$", 1)[0]
+
+
+def test_default_method_keeps_werkzeug_hashes():
+    hasher = PasswordHasher("scrypt", workers=0)
+    assert not hasher.needs_rehash(generate_password_hash("secret"))
+    assert hasher.needs_rehash(generate_password_hash("secret", "pbkdf2:sha256:600000"))
+
+
+def _slow(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_timeout_is_busy_and_keeps_the_slot_until_the_job_ends():
+    hasher = PasswordHasher("scrypt", workers=1, max_pending=1, timeout=0.2)
+    try:
+        # Warm the pool up so process start-up (a fresh spawned interpreter)
+        # doesn't count against the timeout
+        hasher.timeout = 30
+        assert hasher._run(_slow, 0) == 0
+        hasher.timeout = 0.2
+        with pytest.raises(HashingBusy):
+            hasher._run(_slow, 1.5)
+        # The timed-out job still runs, so its slot is still taken
+        with pytest.raises(HashingBusy):
+            hasher._run(_slow, 0)
+        time.sleep(1.5)
+        assert hasher._run(_slow, 0) == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_login_succeeds_when_the_rehash_pool_is_busy(app, client, monkeypatch):
+    register(client)
+    old_hash = generate_password_hash("secret123", "pbkdf2:sha256:1000")
+    with app.app_context():
+        User.query.filter_by(username="bob").update({"password_hash": old_hash})
+        db.session.commit()
+        hasher = auth_settings().hasher
+
+    def busy(plain):
+        raise HashingBusy()
+
+    monkeypatch.setattr(hasher, "hash", busy)
+    response = client.post("/api/auth/login", json={"email": "bob@example.com", "password": "secret123"})
+    assert response.status_code == 200
+    assert response.json["access_token"]
+    with app.app_context():
+        # Kept the old hash; the upgrade happens on a later login
+        assert User.query.filter_by(username="bob").one().password_hash == old_hash
@@ -0,0 +1,42 @@
+"""Scrape endpoints are private: disabled without METRICS_TOKEN, and only
+served to requests carrying it."""
+import time
+
+from flask import g
+from sqlalchemy import exc
+
+from app import db
+
+
+def test_metrics_disabled_without_token(client):
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics/db_pool").status_code == 404
+
+
+def test_metrics_need_the_token(make_app):
+    client = make_app(METRICS_TOKEN="scrape-token").test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert "bbuddy_http_request" in response.get_data(as_text=True)
+
+    assert client.get("/metrics/db_pool").status_code == 401
+    response = client.get("/metrics/db_pool", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert "default" in response.json
+
+
+def test_failed_statement_does_not_skew_query_timing(app):
+    with app.test_request_context():
+        g.timings = {}
+        with db.engine.connect() as connection:
+            try:
+                connection.exec_driver_sql("SELECT * FROM no_such_table")
+            except exc.OperationalError:
+                pass
+            time.sleep(0.3)
+            connection.exec_driver_sql("SELECT 1")
+        assert g.timings["db_queries"] == 1
+        assert g.timings["db"] < 0.3
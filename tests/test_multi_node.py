@@ -0,0 +1,122 @@
+"""Several app workers (separate create_app() instances, as in separate
+processes) behind a round-robin proxy, sharing one database and one
+Redis (fakeredis). Whatever one node does must be visible on every other
+node: token revocations, ETag versions, cached responses and live events."""
+import itertools
+
+import pytest
+
+from .conftest import create_plan, register
+
+fakeredis = pytest.importorskip("fakeredis")
+redis = pytest.importorskip("redis")
+
+NODES = 3
+
+
+class RoundRobinProxy:
+    # Sends each request to the next node in turn, like a load balancer
+    def __init__(self, apps):
+        self.nodes = [app.test_client() for app in apps]
+        self._next = itertools.cycle(self.nodes)
+
+    def open(self, *args, **kwargs):
+        return next(self._next).open(*args, **kwargs)
+
+    def get(self, *args, **kwargs):
+        return self.open(*args, method="GET", **kwargs)
+
+    def post(self, *args, **kwargs):
+        return self.open(*args, method="POST", **kwargs)
+
+    def put(self, *args, **kwargs):
+        return self.open(*args, method="PUT", **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.open(*args, method="DELETE", **kwargs)
+
+
+@pytest.fixture
+def proxy(make_app, monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url",
+                        classmethod(lambda cls, url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs)))
+    apps = [make_app(CACHE_URL="redis://shared", SSE_HEARTBEAT=0.1, SSE_MAX_DURATION=3) for _ in range(NODES)]
+    return RoundRobinProxy(apps)
+
+
+def add_expense(client, headers, plan_id, category_id, amount="10.00"):
+    response = client.post("/api/expenses/expenses", json={
+        "plan_id": plan_id, "category_id": category_id, "amount": amount,
+        "description": "x", "expense_date": "2026-02-01"
+    }, headers=headers)
+    assert response.status_code == 201, response.json
+    return response.json["expense_id"]
+
+
+def test_round_robin_reads_always_see_earlier_writes(proxy):
+    headers = register(proxy)
+    category_id, plan_id = create_plan(proxy, headers)
+
+    etags = {}
+    for i in range(1, 7):
+        add_expense(proxy, headers, plan_id, category_id)
+        # Every node in turn, each with the ETag it saw last time
+        for node, client in enumerate(proxy.nodes):
+            conditional = {"If-None-Match": etags[node]} if node in etags else {}
+            response = client.get("/api/dashboard", headers={**headers, **conditional})
+            assert response.status_code == 200
+            assert response.json["expense_count"] == i
+            assert response.json["budget_plans"][0]["spent"] == 10.0 * i
+            etags[node] = response.headers["ETag"]
+
+        # Nothing changed since: every node agrees on the ETag and answers 304
+        assert len(set(etags.values())) == 1
+        for client in proxy.nodes:
+            assert client.get("/api/dashboard", headers={**headers, "If-None-Match": etags[0]}).status_code == 304
+
+
+def test_cached_response_on_one_node_is_dropped_by_a_write_on_another(proxy):
+    headers = register(proxy)
+    category_id, plan_id = create_plan(proxy, headers)
+    reader, writer = proxy.nodes[0], proxy.nodes[1]
+
+    # Fill node 0's response cache, then write through node 1
+    assert reader.get("/api/budget_plans/budget_plans", headers=headers).json[0]["spent"] == 0
+    assert reader.get("/api/budget_plans/budget_plans", headers=headers).json[0]["spent"] == 0
+    add_expense(writer, headers, plan_id, category_id, "25.00")
+
+    assert reader.get("/api/budget_plans/budget_plans", headers=headers).json[0]["spent"] == 25.0
+
+
+def test_refresh_token_cannot_be_replayed_on_another_node(proxy):
+    response = proxy.nodes[0].post("/api/auth/register", json={
+        "username": "carol", "email": "carol@example.com", "password": "secret123"
+    })
+    refresh_token = response.json["refresh_token"]
+
+    first = proxy.nodes[1].post("/api/auth/refresh", json={"refresh_token": refresh_token})
+    assert first.status_code == 200
+    replay = proxy.nodes[2].post("/api/auth/refresh", json={"refresh_token": refresh_token})
+    assert replay.status_code == 401
+    assert replay.json["error"] == "token_revoked"
+
+
+def test_events_reach_streams_on_other_nodes(proxy):
+    headers = register(proxy)
+    category_id, plan_id = create_plan(proxy, headers)
+
+    stream = proxy.nodes[2].get("/api/events/stream", headers=headers, buffered=False)
+    chunks = iter(stream.response)
+    assert b"event: ready" in next(chunks)
+
+    expense_id = add_expense(proxy.nodes[0], headers, plan_id, category_id)
+
+    received = b""
+    for chunk in chunks:
+        received += chunk
+        if b"event: plan.spent" in received:
+            break
+    stream.close()
+    assert f'"expense_id":{expense_id}'.encode() in received
+    assert b"event: expense.created" in received
@@ -0,0 +1,66 @@
+"""Connection pool exhaustion: with DB_POOL_SIZE=2 and no overflow, a request
+that cannot get a connection within DB_POOL_TIMEOUT must get a 503 with
+Retry-After (not a 500), and the pool must count the timeout."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import db
+
+from .conftest import create_plan, register
+
+METRICS_HEADERS = {"Authorization": "Bearer scrape-token"}
+
+
+@pytest.fixture
+def small_pool_app(make_app):
+    return make_app(DB_POOL_SIZE=2, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT=1, METRICS_TOKEN="scrape-token")
+
+
+def test_exhausted_pool_returns_503_and_counts_timeout(small_pool_app):
+    client = small_pool_app.test_client()
+    headers = register(client)
+
+    with small_pool_app.app_context():
+        engine = db.engine
+        held = [engine.connect() for _ in range(2)]
+        try:
+            response = client.get("/api/budget_plans/budget_plans", headers=headers)
+        finally:
+            for connection in held:
+                connection.close()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json["error"] == "service_busy"
+
+    stats = client.get("/metrics/db_pool", headers=METRICS_HEADERS).json["default"]
+    assert stats["timeouts"] == 1
+    assert stats["size"] == 2
+    assert stats["max_wait_ms"] >= 900
+    assert 'bbuddy_db_pool_timeouts_total{pool="default"} 1' in client.get("/metrics", headers=METRICS_HEADERS).get_data(as_text=True)
+
+    # Connections are back: the same request works again
+    assert client.get("/api/budget_plans/budget_plans", headers=headers).status_code == 200
+
+
+def test_more_concurrent_requests_than_connections_still_succeed(small_pool_app):
+    client = small_pool_app.test_client()
+    headers = register(client)
+    category_id, plan_id = create_plan(client, headers)
+
+    def request(i):
+        own = small_pool_app.test_client()
+        if i % 2:
+            return own.get(f"/api/budget_plans/budget_plans/{plan_id}", headers=headers).status_code
+        return own.post("/api/expenses/expenses", json={
+            "plan_id": plan_id, "category_id": category_id, "amount": "1.50",
+            "description": f"e{i}", "expense_date": "2026-02-01"
+        }, headers=headers).status_code
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        statuses = list(pool.map(request, range(60)))
+
+    # Short requests wait briefly for a connection instead of failing
+    assert set(statuses) <= {200, 201}
+    assert client.get("/metrics/db_pool", headers=METRICS_HEADERS).json["default"]["checked_out"] == 0
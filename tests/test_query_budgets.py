@@ -0,0 +1,110 @@
+"""SQL statement budgets per endpoint. List endpoints must run the same
+number of queries however many rows they return; a budget failure lists
+the statements that ran (see app.querycount.assert_max_queries)."""
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.querycount import assert_max_queries, count_queries
+
+from .conftest import create_plan, register
+
+
+def add_expenses(client, headers, plan_id, category_id, n):
+    for i in range(n):
+        assert client.post("/api/expenses/expenses", json={
+            "plan_id": plan_id, "category_id": category_id, "amount": "1.50",
+            "description": f"e{i}", "expense_date": f"2026-03-{i % 28 + 1:02d}"
+        }, headers=headers).status_code == 201
+
+
+def queries_for(client, path, headers):
+    with count_queries() as queries:
+        assert client.get(path, headers=headers).status_code == 200
+    return queries.count
+
+
+def test_dashboard_budget(client):
+    headers = register(client)
+    category_id, plan_id = create_plan(client, headers)
+    add_expenses(client, headers, plan_id, category_id, 3)
+
+    with assert_max_queries(5):
+        assert client.get("/api/dashboard", headers=headers).status_code == 200
+
+
+@pytest.mark.parametrize("path", [
+    "/api/budget_plans/budget_plans",
+    "/api/expenses/expenses",
+    "/api/expenses/expenses/{plan_id}",
+    "/api/dashboard",
+])
+def test_lists_do_not_grow_with_rows(client, path):
+    headers = register(client)
+    category_id, plan_id = create_plan(client, headers)
+    path = path.format(plan_id=plan_id)
+
+    add_expenses(client, headers, plan_id, category_id, 1)
+    create_plan(client, headers, amount=2000)
+    few = queries_for(client, path, headers)
+
+    add_expenses(client, headers, plan_id, category_id, 25)
+    for amount in range(3000, 3010):
+        create_plan(client, headers, amount=amount)
+    assert queries_for(client, path, headers) == few
+
+
+def test_delete_plan_budget_is_independent_of_expenses(client):
+    headers = register(client)
+    category_id, plan_id = create_plan(client, headers)
+    add_expenses(client, headers, plan_id, category_id, 25)
+
+    # plan lookup, COUNT(expenses), three bulk deletes, the plan itself
+    with assert_max_queries(6):
+        response = client.delete(f"/api/budget_plans/budget_plans/{plan_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json["expenses_deleted_count"] == 25
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def query_warnings():
+    # The "app" logger does not propagate, so listen on querycount's own logger
+    handler = ListHandler()
+    logger = logging.getLogger("app.querycount")
+    logger.addHandler(handler)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+def test_repeated_statement_warning(make_app, query_warnings):
+    app = make_app(QUERY_REPEAT_WARN=True, QUERY_REPEAT_THRESHOLD=3)
+
+    @app.route("/_loop/<int:n>")
+    def loop(n):
+        # What an N+1 loop looks like: one statement shape, n times
+        for i in range(n):
+            db.session.execute(text("SELECT :i"), {"i": i})
+        return "ok"
+
+    client = app.test_client()
+    assert client.get("/_loop/2").status_code == 200
+    assert query_warnings == []
+
+    assert client.get("/_loop/4").status_code == 200
+    assert len(query_warnings) == 1
+    record = query_warnings[0]
+    assert record.getMessage() == "repeated SQL statement, possible N+1"
+    assert record.count == 4
+    assert record.endpoint == "loop"
+    assert record.statement == "SELECT ?"
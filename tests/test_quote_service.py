@@ -0,0 +1,32 @@
+"""The quote pool refill lock must stay held for as long as a refill runs,
+however long that is, so two nodes never refill a shared pool at once."""
+import threading
+import time
+
+from app.cache import MemoryCache
+from app.quote_service import QuoteService
+
+
+def slow_generator(seconds):
+    def generate():
+        time.sleep(seconds)
+        return "Spend less than you earn.", "test-model"
+    return generate
+
+
+def test_refill_lock_outlives_its_ttl_while_refilling():
+    cache = MemoryCache()
+    # Each quote takes 0.2s, the whole refill ~1s: five times the lock TTL
+    first = QuoteService(slow_generator(0.2), ["fallback"], cache, pool_size=5, lock_ttl=0.3)
+    second = QuoteService(slow_generator(0), ["fallback"], cache, pool_size=50, lock_ttl=0.3)
+
+    refill = threading.Thread(target=first.fill)
+    refill.start()
+    time.sleep(0.7)
+    assert second.fill() is False  # the first node still holds the lock
+    refill.join()
+
+    assert len(first) == 5
+    assert cache.get(QuoteService.REFILL_LOCK) is None
+    assert second.fill() is True
+    assert len(second) == 50
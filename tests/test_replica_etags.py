@@ -0,0 +1,66 @@
+"""Reads served by a lagging replica must not get an ETag (or a response
+cache entry): the versions behind the ETag already include writes the
+replica has not seen, so a later If-None-Match would pin the stale body."""
+import shutil
+
+import pytest
+
+from app import db
+
+from .conftest import create_plan, register
+
+
+@pytest.fixture
+def replica_app(make_app, tmp_path):
+    # DB_READ_AFTER_WRITE_WINDOW=0: every eligible read goes to the replica
+    return make_app(DB_REPLICA_URIS=[f"sqlite:///{tmp_path / 'replica.db'}"], DB_READ_AFTER_WRITE_WINDOW=0)
+
+
+def sync_replica(app, tmp_path):
+    with app.app_context():
+        db.engines["replica_0"].dispose()
+    shutil.copy(tmp_path / "test.db", tmp_path / "replica.db")
+
+
+def test_stale_replica_body_gets_no_etag(replica_app, tmp_path):
+    client = replica_app.test_client()
+    headers = register(client)
+    sync_replica(replica_app, tmp_path)
+
+    assert client.post("/api/categories/categories", json={"name": "Food"}, headers=headers).status_code == 201
+
+    stale = client.get("/api/categories/categories", headers=headers)
+    assert stale.status_code == 200
+    assert stale.json == []
+    assert "ETag" not in stale.headers
+
+    # Once the replica catches up the client sees the category, not a cached []
+    sync_replica(replica_app, tmp_path)
+    fresh = client.get("/api/categories/categories", headers=headers)
+    assert [c["name"] for c in fresh.json] == ["Food"]
+
+
+def test_primary_reads_keep_etags(make_app):
+    client = make_app().test_client()
+    headers = register(client)
+    response = client.get("/api/categories/categories", headers=headers)
+    etag = response.headers["ETag"]
+    assert client.get("/api/categories/categories", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_category_rename_refreshes_expense_list(make_app):
+    # The expense list embeds category_name, so it depends on "categories" too
+    client = make_app().test_client()
+    headers = register(client)
+    category_id, plan_id = create_plan(client, headers)
+    assert client.post("/api/expenses/expenses", json={
+        "plan_id": plan_id, "category_id": category_id, "amount": "5", "description": "lunch",
+        "expense_date": "2026-03-01"
+    }, headers=headers).status_code == 201
+    etag = client.get("/api/expenses/expenses", headers=headers).headers["ETag"]
+
+    assert client.put(f"/api/categories/categories/{category_id}", json={"name": "Groceries"},
+                      headers=headers).status_code == 200
+    response = client.get("/api/expenses/expenses", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert "Groceries" in response.get_data(as_text=True)
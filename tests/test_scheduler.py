@@ -0,0 +1,140 @@
+"""Scheduler time travel: stepping run_due() through the days must roll
+plans over month by month, create each recurring expense exactly once and
+in the plan covering its date, and end up with the same result as one
+catch-up run at the last day."""
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.models.budget_plan_model import BudgetPlan
+from app.models.expense_model import Expense
+from app.scheduler import run_due
+from app.spending import verify_plan_spent, verify_rollups
+
+from .conftest import create_plan, register
+
+FIRST_DAY = date(2025, 12, 31)
+LAST_DAY = date(2026, 4, 30)
+
+PLAN_PERIODS = [
+    (date(2026, 1, 1), date(2026, 1, 31)),
+    (date(2026, 2, 1), date(2026, 2, 28)),
+    (date(2026, 3, 1), date(2026, 3, 31)),
+    (date(2026, 4, 1), date(2026, 4, 30)),
+]
+WEEKLY = [date(2026, 1, 5) + timedelta(weeks=n) for n in range(17)]  # up to Apr 27
+MONTHLY = [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)]  # clamped, no drift
+
+
+def add_templates(client):
+    headers = register(client)
+    _, plan_id = create_plan(client, headers, amount=500, start_date="2026-01-01", end_date="2026-01-31",
+                             auto_rollover=True)
+    for frequency, start, amount in (("weekly", "2026-01-05", "10"), ("monthly", "2026-01-31", "100")):
+        response = client.post("/api/recurring", json={
+            "plan_id": plan_id, "amount": amount, "description": frequency,
+            "frequency": frequency, "start_date": start
+        }, headers=headers)
+        assert response.status_code == 201, response.json
+
+
+def expenses_by_description():
+    # {description: [date, ...]}, checking each expense sits in the plan covering its date
+    result = {}
+    rows = db.session.query(Expense.description, Expense.expense_date, BudgetPlan.start_date, BudgetPlan.end_date).\
+        join(BudgetPlan, Expense.plan_id == BudgetPlan.plan_id).\
+        order_by(Expense.expense_date)
+    for description, expense_date, start, end in rows:
+        day = expense_date.date()
+        assert start <= day <= end, (description, day, start, end)
+        result.setdefault(description, []).append(day)
+    return result
+
+
+def plan_periods():
+    return [(p.start_date, p.end_date) for p in BudgetPlan.query.order_by(BudgetPlan.start_date)]
+
+
+def test_stepping_day_by_day(app, client):
+    add_templates(client)
+
+    with app.app_context():
+        day = FIRST_DAY
+        while day <= LAST_DAY:
+            run_due(today=day)
+            # Rerunning the same day creates nothing
+            assert run_due(today=day) == {"plans_rolled": 0, "expenses_created": 0}
+
+            expenses = expenses_by_description()
+            assert expenses.get("weekly", []) == [d for d in WEEKLY if d <= day]
+            assert expenses.get("monthly", []) == [d for d in MONTHLY if d <= day]
+            # A plan rolls over the day after it ends
+            assert plan_periods() == PLAN_PERIODS[:1] + [p for p in PLAN_PERIODS[1:] if p[0] <= day]
+            day += timedelta(days=1)
+
+        assert plan_periods() == PLAN_PERIODS
+        assert verify_plan_spent() == []
+        assert verify_rollups() == []
+
+
+def test_catch_up_matches_stepping(app, client):
+    add_templates(client)
+
+    with app.app_context():
+        assert run_due(today=LAST_DAY) == {"plans_rolled": 3, "expenses_created": len(WEEKLY) + len(MONTHLY)}
+        assert run_due(today=LAST_DAY) == {"plans_rolled": 0, "expenses_created": 0}
+
+        assert expenses_by_description() == {"weekly": WEEKLY, "monthly": MONTHLY}
+        assert plan_periods() == PLAN_PERIODS
+        assert verify_plan_spent() == []
+        assert verify_rollups() == []
+
+
+def test_cli_refuses_memory_cache(app):
+    result = app.test_cli_runner().invoke(args=["scheduler", "run"])
+    assert result.exit_code == 1
+    assert "CACHE_URL is memory://" in result.output
+
+
+def test_cli_runs_with_shared_cache(make_app, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = pytest.importorskip("redis")
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url",
+                        classmethod(lambda cls, url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs)))
+    app = make_app(CACHE_URL="redis://shared")
+
+    result = app.test_cli_runner().invoke(args=["scheduler", "run", "--date", "2026-01-01"])
+    assert result.exit_code == 0, result.output
+    assert "rolled over 0 plan(s), created 0 expense(s)" in result.output
+
+
+def test_in_process_scheduler_invalidates_etags(make_app):
+    app = make_app(SCHEDULER_INTERVAL=0.2)
+    client = app.test_client()
+    headers = register(client)  # the first request starts the scheduler thread
+    scheduler = app.extensions["scheduler"]
+    try:
+        today = date.today()
+        _, plan_id = create_plan(client, headers, start_date=str(today - timedelta(days=10)),
+                                 end_date=str(today + timedelta(days=10)))
+        etag = client.get("/api/expenses/expenses", headers=headers).headers["ETag"]
+        assert client.post("/api/recurring", json={
+            "plan_id": plan_id, "amount": "3", "description": "coffee",
+            "frequency": "daily", "start_date": str(today - timedelta(days=2))
+        }, headers=headers).status_code == 201
+
+        # The web process sees the scheduler's version bumps: no stale 304
+        deadline = time.monotonic() + 10
+        while True:
+            response = client.get("/api/expenses/expenses", headers={**headers, "If-None-Match": etag})
+            if response.status_code == 200 or time.monotonic() > deadline:
+                break
+            time.sleep(0.1)
+        assert response.status_code == 200
+        assert [e["description"] for e in response.json] == ["coffee"] * 3
+    finally:
+        scheduler.stop()
+        scheduler._thread.join(5)
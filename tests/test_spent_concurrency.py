@@ -0,0 +1,54 @@
+"""Stress test for atomic BudgetPlan.spent updates: many clients writing to
+the same plan at once must leave spent equal to SUM(expenses.amount)."""
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from app import db
+from app.models.budget_plan_model import BudgetPlan
+from app.models.expense_model import Expense
+from app.spending import verify_plan_spent, verify_rollups
+
+from .conftest import create_plan, register
+
+THREADS = 8
+WRITES_PER_THREAD = 15
+
+
+def test_parallel_writes_keep_spent_equal_to_sum(app, client):
+    headers = register(client)
+    category_id, plan_id = create_plan(client, headers)
+
+    def writer(worker):
+        # Each thread uses its own client, like separate concurrent requests
+        own = app.test_client()
+        statuses = []
+        for i in range(WRITES_PER_THREAD):
+            response = own.post("/api/expenses/expenses", json={
+                "plan_id": plan_id,
+                "category_id": category_id,
+                "amount": f"{worker + 1}.{i:02d}",
+                "description": f"w{worker}-{i}",
+                "expense_date": f"2026-03-{i % 28 + 1:02d}"
+            }, headers=headers)
+            statuses.append(response.status_code)
+            expense_id = response.json["expense_id"]
+            # Mix in updates and deletes so all three code paths race
+            if i % 3 == 1:
+                statuses.append(own.put(f"/api/expenses/expenses/{expense_id}", json={
+                    "amount": "7.25"
+                }, headers=headers).status_code)
+            elif i % 5 == 4:
+                statuses.append(own.delete(f"/api/expenses/expenses/{expense_id}", headers=headers).status_code)
+        return statuses
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(writer, range(THREADS)))
+
+    assert all(status in (200, 201) for statuses in results for status in statuses)
+
+    with app.app_context():
+        spent = db.session.get(BudgetPlan, plan_id).spent
+        total = db.session.query(db.func.sum(Expense.amount)).filter(Expense.plan_id == plan_id).scalar()
+        assert Decimal(spent) == Decimal(total)
+        assert verify_plan_spent() == []
+        assert verify_rollups() == []